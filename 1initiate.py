@@ -1,67 +1,64 @@
 import os
-from dotenv import load_dotenv
+import sys
+import argparse
 from urllib.parse import urlparse, parse_qs
+from utils.env import load_env
+from utils.token_store import TokenStore
 
-# Load environment variables from .env file
-load_dotenv()
+# Base URL of the authorization service
+AUTH_BASE_URL = 'https://openapi-auth.alibaba.com/oauth'
 
-# Get parameters from environment variables
-app_key = os.getenv('APP_KEY')
-redirect_uri = os.getenv('REDIRECT_URI')
+def build_authorization_url(app_key, redirect_uri):
+    """Return the URL the user visits to authorize the application"""
+    return f"{AUTH_BASE_URL}/authorize?response_type=code&redirect_uri={redirect_uri}&client_id={app_key}"
 
-# Ensure APP_KEY and REDIRECT_URI are set correctly in your .env file
-if not app_key:
-    print("APP_KEY is missing or not set in the .env file.")
-    exit(1)
+def extract_auth_code(redirected_url):
+    """Return the authorization code from the URL the user was redirected to, or None"""
+    query_params = parse_qs(urlparse(redirected_url).query)
+    return query_params.get('code', [None])[0]
 
-if not redirect_uri:
-    print("REDIRECT_URI is missing or not set in the .env file.")
-    exit(1)
+def main():
+    parser = argparse.ArgumentParser(description='Start the OAuth flow: print the authorization URL and store the returned code as AUTH_CODE in .env',
+                                     epilog='Reads APP_KEY and REDIRECT_URI from .env')
+    parser.parse_args()
 
-# Construct base URL
-base_url = 'https://openapi-auth.alibaba.com/oauth'
+    # Load environment variables from .env file
+    load_env()
 
-# URL to redirect the user for authorization
-auth_url = f"{base_url}/authorize?response_type=code&redirect_uri={redirect_uri}&client_id={app_key}"
+    # Get parameters from environment variables
+    app_key = os.getenv('APP_KEY')
+    redirect_uri = os.getenv('REDIRECT_URI')
 
-print("Please visit the following URL to authorize the application:")
-print(auth_url)
+    # Ensure APP_KEY and REDIRECT_URI are set correctly in your .env file
+    if not app_key:
+        print("APP_KEY is missing or not set in the .env file.")
+        sys.exit(1)
 
-# Get the redirected URL from the user (assuming manual input for simplicity)
-redirected_url = input("Please enter the redirected URL after authorization: ")
+    if not redirect_uri:
+        print("REDIRECT_URI is missing or not set in the .env file.")
+        sys.exit(1)
 
-# Parse the URL to extract the query parameters
-parsed_url = urlparse(redirected_url)
-query_params = parse_qs(parsed_url.query)
+    print("Please visit the following URL to authorize the application:")
+    print(build_authorization_url(app_key, redirect_uri))
 
-# Extract the authorization code
-auth_code = query_params.get('code', [None])[0]
+    # Get the redirected URL from the user (assuming manual input for simplicity)
+    redirected_url = input("Please enter the redirected URL after authorization: ")
 
-# Print extracted value
-print(f"Authorization Code: {auth_code}")
+    # Extract the authorization code
+    auth_code = extract_auth_code(redirected_url)
 
-# Ensure AUTH_CODE is available
-if not auth_code:
-    print("Authorization code is missing.")
-    exit(1)
+    # Print extracted value
+    print(f"Authorization Code: {auth_code}")
 
-# Read the current .env file
-env_path = '.env'
-env_vars = {}
-if os.path.exists(env_path):
-    with open(env_path, 'r') as env_file:
-        for line in env_file:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                key, value = line.split('=', 1)
-                env_vars[key] = value
+    # Ensure AUTH_CODE is available
+    if not auth_code:
+        print("Authorization code is missing.")
+        sys.exit(1)
 
-# Update the env_vars with the new value
-env_vars['AUTH_CODE'] = auth_code
+    # Update AUTH_CODE in the .env file atomically, leaving the other entries untouched
+    TokenStore().update({'AUTH_CODE': auth_code})
 
-# Write the updated environment variables back to the .env file
-with open(env_path, 'w') as env_file:
-    for key, value in env_vars.items():
-        env_file.write(f'{key}={value}\n')
+    print("Authorization code has been updated in the .env file.")
 
-print("Authorization code has been updated in the .env file.")
+if __name__ == "__main__":
+    main()
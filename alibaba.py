@@ -0,0 +1,152 @@
+import sys
+import shlex
+import importlib
+
+from utils.env import load_env
+
+# Subcommand words -> (module whose main() implements it, summary)
+# Modules are imported only when their command runs, so `alibaba.py list`
+# never loads the schema, photo bank or async crawling code.
+COMMANDS = {
+    ('auth', 'init'): ('1initiate', 'Start the OAuth flow and store the authorization code'),
+    ('auth', 'create-token'): ('2createtoken', 'Exchange the authorization code for tokens'),
+    ('auth', 'refresh-token'): ('3refreshtoken', 'Refresh the access token'),
+
+    ('list',): ('product_list', 'List one page of products'),
+    ('list-all',): ('product_list_all', 'Fetch all products with pagination'),
+    ('get',): ('product_get', 'Get product details'),
+    ('batch-get',): ('tools.product_batch_get', 'Fetch details for every product in a CSV'),
+    ('sync',): ('tools.product_sync', 'Incrementally sync products modified since the last run'),
+    ('available',): ('product_available_get', 'Check product availability'),
+    ('score',): ('product_score_get', 'Get the quality score of a product'),
+    ('display',): ('product_update_display', 'Put products on or off sale'),
+    ('group', 'add'): ('product_group_add', 'Add a product to a group'),
+    ('id',): ('product_id_encrypt', 'Convert between original and encrypted product IDs'),
+
+    ('inventory', 'get'): ('product_inventory_get', 'Get product inventory'),
+    ('inventory', 'update'): ('product_inventory_update', 'Update product inventory'),
+
+    ('category', 'get'): ('product_category_get', 'Get category information'),
+    ('category', 'root'): ('product_category_get_root', 'Get the top-level categories'),
+    ('category', 'mapping'): ('product_category_id_mapping', 'Map category, attribute and value IDs'),
+    ('category', 'tree'): ('product_category_tree', 'Build or query the offline category tree'),
+
+    ('schema', 'get'): ('product_schema_get', 'Get and store a category schema'),
+    ('schema', 'add'): ('product_schema_add', 'Add a new product schema'),
+    ('schema', 'add-draft'): ('product_schema_add_draft', 'Add a new product schema draft'),
+    ('schema', 'update'): ('product_schema_update', 'Update an existing product schema'),
+    ('schema', 'render'): ('product_schema_render', 'Render a product schema'),
+    ('schema', 'render-draft'): ('product_schema_render_draft', 'Render a draft product schema'),
+    ('schema', 'level'): ('product_schema_level_get', 'Get the schema level of a category'),
+    ('schema', 'validate'): ('tools.schema_validate', 'Validate schema data against the stored schema'),
+    ('schema', 'fields'): ('tools.schema_fields', 'Export a field index of every stored schema'),
+
+    ('photobank', 'list'): ('product_photobank_list', 'List photo bank images'),
+    ('photobank', 'groups'): ('product_photobank_group_list', 'List photo bank groups'),
+    ('photobank', 'group'): ('product_photobank_group_operate', 'Create, update or delete a photo bank group'),
+    ('photobank', 'upload'): ('product_photobank_upload', 'Upload an image to the photo bank'),
+}
+
+def usage():
+    lines = [
+        "usage: python alibaba.py <command> [options]",
+        "       python alibaba.py --batch < commands.txt",
+        "",
+        "Run `python alibaba.py <command> -h` for the options of a command.",
+        "",
+        "commands:"
+    ]
+    width = max(len(' '.join(words)) for words in COMMANDS)
+    for words, (_, summary) in COMMANDS.items():
+        lines.append(f"  {' '.join(words):<{width}}  {summary}")
+    lines += [
+        "",
+        "--batch reads one command per line from stdin (blank lines and # comments",
+        "are skipped) and runs them all in this process, sharing imports, the .env",
+        "load, pooled connections and caches."
+    ]
+    return '\n'.join(lines)
+
+def resolve(argv):
+    """
+    Match the leading words of argv to a command.
+
+    Returns:
+        tuple: (command words, module name, remaining arguments), or None if no command matches
+    """
+    for length in (2, 1):
+        words = tuple(argv[:length])
+        if len(words) == length and words in COMMANDS:
+            return words, COMMANDS[words][0], argv[length:]
+    return None
+
+def run(argv, show_usage=True):
+    """
+    Run one command in this process.
+
+    The command's module is imported on first use and its main() is called
+    with sys.argv set to the remaining arguments. main() reports failure by
+    returning a non-zero status or raising SystemExit.
+
+    Returns:
+        int: Exit status (non-zero if the command failed)
+    """
+    resolved = resolve(argv)
+    if resolved is None:
+        print(f"Unknown command: {' '.join(argv[:2]) or '(none)'}", file=sys.stderr)
+        if show_usage:
+            print(f"\n{usage()}", file=sys.stderr)
+        return 2
+    words, module_name, args = resolved
+
+    saved_argv = sys.argv
+    sys.argv = [f"alibaba.py {' '.join(words)}"] + args
+    try:
+        status = importlib.import_module(module_name).main()
+        return status if isinstance(status, int) and not isinstance(status, bool) else 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = saved_argv
+
+def run_batch(stream):
+    """
+    Run every command line read from stream, continuing past failures.
+
+    Returns:
+        int: 0 if every command succeeded, otherwise 1
+    """
+    total = failed = 0
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        total += 1
+        try:
+            status = run(shlex.split(line), show_usage=False)
+        except Exception as e:
+            print(f"Line {line_number}: {type(e).__name__}: {e}", file=sys.stderr)
+            status = 1
+        if status:
+            failed += 1
+            print(f"Line {line_number} failed (exit status {status}): {line}", file=sys.stderr)
+        sys.stdout.flush()
+    print(f"Batch finished: {total - failed}/{total} commands succeeded", file=sys.stderr)
+    return 1 if failed else 0
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    # Loaded once here so every command in a batch shares it (the commands' own load_env() is then a no-op)
+    load_env()
+    if argv[0] == '--batch':
+        return run_batch(sys.stdin)
+    return run(argv)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,72 +1,24 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
-import time
 import argparse
 from datetime import datetime
 from utils.terminal_colors import print_error, print_info, print_header, print_success
-
-def generate_signature(params, app_secret, api_operation):
-    """Generate signature for API request"""
-    # Sort parameters by key
-    sorted_params = sorted(params.items(), key=lambda x: x[0])
-    
-    # Create the string to sign
-    string_to_sign = api_operation
-    for key, value in sorted_params:
-        string_to_sign += key + str(value)
-    
-    # Add app secret at the beginning and end
-    string_to_sign = app_secret + string_to_sign + app_secret
-    
-    # Generate signature using SHA256
-    import hashlib
-    signature = hashlib.sha256(string_to_sign.encode('utf-8')).hexdigest().upper()
-    return signature
+from utils.gop_client import get_client
+from utils.env import load_env
 
 def check_product_availability(app_key, app_secret, access_token, product_id):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/other/available/get"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    client = get_client(app_key, app_secret, access_token)
 
-    # Create the product request object
-    product_request = {
-        "productId": str(product_id)
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "product_id": str(product_id)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("product.available.get", product_id=product_id)
 
     try:
         print_info("\nSending request to Alibaba API...")
         
-        # Import requests here to avoid global import
-        import requests
-        
         # Make the API call
-        response = requests.post(
-            ALIBABA_SERVER_CALL_ENTRY,
-            headers=headers,
-            data=params
-        )
+        response = client.post(params)
         
         # Prepare logging
         log_dir = 'api_logs'
@@ -91,6 +43,9 @@ def main():
     parser.add_argument('--product_id', type=str, required=True, help='Product ID to check availability for')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -99,7 +54,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Checking Product Availability ===")
     print_info(f"Product ID: {args.product_id}")
@@ -115,8 +70,10 @@ def main():
         else:
             print_error("\nAPI call failed!")
             print_error(f"Error message: {result.get('message', 'Unknown error')}")
+            return 1
     else:
         print_error("\nFailed to get response from API")
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
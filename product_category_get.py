@@ -1,67 +1,38 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
 import argparse  # Add this import
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Function to generate the signature with SHA-256
-def generate_signature(params, secret_key, api_operation):
-    # Step 1: Sort all request parameters
-    sorted_params = sorted(params.items())
-
-    # Step 2: Concatenate the sorted parameters and their values into a string
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-
-    # Step 3: Generate HMAC SHA-256
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.endpoints import get_endpoint
+from utils.env import load_env
+from utils.response_cache import print_cache_summary
 
 def main():
+    import requests
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Get product category information from Alibaba API')
     parser.add_argument('category_id', help='The category ID to query')
+    parser.add_argument('--no-cache', action='store_true', help='Always query the API instead of the local response cache')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve parameters from environment
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/category/get"  # Updated to correct path format
 
-    # Prepare the request parameters
-    timestamp = str(int(time.time() * 1000))  # Current timestamp in milliseconds
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "cat_id": args.category_id  # Use the command-line argument here
-    }
-
-    # Generate the signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print("\nMissing required environment variables. Please check your .env file.")
+        print("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
 
-    # Add the generated signature to the params dictionary
-    params['sign'] = signature
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',  # Use Protocol.GOP
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    # Build and sign the request from the endpoint registry
+    endpoint = get_endpoint("category.get")
+    params = client.prepare(endpoint, cat_id=args.category_id)
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -74,7 +45,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": f"{ALIBABA_SERVER_CALL_ENTRY}",
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {
             "format": params.get("format"),
             "method": params.get("method"),
@@ -86,7 +57,9 @@ def main():
 
     try:
         # Make the POST request - updated to append API operation to base URL
-        response = requests.post(f"{ALIBABA_SERVER_CALL_ENTRY}{API_OPERATION}", data=params, headers=headers)
+        response = client.post(params, path=endpoint.post_path, use_cache=not args.no_cache)
+        if getattr(response, 'from_cache', False):
+            print("Served from the local response cache (use --no-cache to refresh)")
         
         # Handle the response
         response_data = response.json()
@@ -111,9 +84,15 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) else 1
 
     except requests.exceptions.RequestException as e:
         print(f"\nRequest error: {e}")
+        status = 1
+
+    # Show how much of this run the local response cache answered
+    print_cache_summary()
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,48 +1,35 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
+import argparse
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.endpoints import get_endpoint
+from utils.env import load_env
+from utils.response_cache import print_cache_summary
 
-# Load environment variables from .env file
-load_dotenv()
+def main():
+    import requests
+    parser = argparse.ArgumentParser(description='Get the top-level product categories from Alibaba API')
+    parser.add_argument('--no-cache', action='store_true', help='Always query the API instead of the local response cache')
+    args = parser.parse_args()
 
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+    # Load environment variables from .env file
+    load_env()
 
-def main():
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/category/get"
-
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "cat_id": "0"  # Root category ID to get all top-level categories
-    }
 
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print("\nMissing required environment variables. Please check your .env file.")
+        print("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
 
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    # Build and sign the request from the endpoint registry
+    endpoint = get_endpoint("category.get")
+    params = client.prepare(endpoint, cat_id=0)  # Root category ID to get all top-level categories
 
     log_dir = 'api_logs'
     os.makedirs(log_dir, exist_ok=True)
@@ -53,7 +40,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": f"{ALIBABA_SERVER_CALL_ENTRY}",
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {
             "format": params.get("format"),
             "method": params.get("method"),
@@ -64,7 +51,10 @@ def main():
     }
 
     try:
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        # This call has always gone to the bare entry point rather than the path-suffixed route
+        response = client.post(params, use_cache=not args.no_cache)
+        if getattr(response, 'from_cache', False):
+            print("Served from the local response cache (use --no-cache to refresh)")
         response_data = response.json()
 
         response_log = {
@@ -90,9 +80,15 @@ def main():
         if response_data.get("result", {}).get("result", {}).get("child_ids"):
             print("\nRoot category child IDs:")
             print(response_data["result"]["result"]["child_ids"])
+        status = 0 if is_success(response) else 1
 
     except requests.exceptions.RequestException as e:
         print(f"\nRequest error: {e}")
+        status = 1
+
+    # Show how much of this run the local response cache answered
+    print_cache_summary()
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
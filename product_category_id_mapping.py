@@ -1,35 +1,27 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
+import csv
 import json
+import asyncio
+import argparse
 from datetime import datetime
 from typing import Optional
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    # Step 1: Sort all request parameters
-    sorted_params = sorted(params.items())
-
-    # Step 2: Concatenate the sorted parameters and their values into a string
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-
-    # Step 3: Generate HMAC SHA-256
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.async_gop_client import AsyncGopClient
+from utils.category_id_map import CategoryIdMappingTable, mapping_key, mapping_requests, parse_mapping, preload_mappings
+from utils.endpoints import get_endpoint
+from utils.env import load_env
+from utils.response_cache import print_cache_summary
 
 def get_category_mapping(
     convert_type: Optional[int] = None,
     cat_id: Optional[int] = None,
     attribute_id: Optional[int] = None,
-    attribute_value_id: Optional[int] = None
+    attribute_value_id: Optional[int] = None,
+    use_cache: bool = True,
+    app_key: Optional[str] = None,
+    app_secret: Optional[str] = None,
+    access_token: Optional[str] = None
 ):
     """
     Get category ID mapping based on provided parameters.
@@ -39,44 +31,21 @@ def get_category_mapping(
         cat_id (int, optional): Category ID
         attribute_id (int, optional): Attribute ID
         attribute_value_id (int, optional): Attribute value ID
+        use_cache (bool, optional): Set to False to bypass the local response cache
+        app_key, app_secret, access_token (str, optional): Credentials; default to APP_KEY,
+            APP_SECRET and ACCESS_TOKEN from the environment
     """
-    # Retrieve parameters from environment
-    APP_KEY = os.getenv('APP_KEY')
-    APP_SECRET = os.getenv('APP_SECRET')
-    ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/alibaba/icbu/category/id/mapping"
-
-    # Prepare the request parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-    }
-
-    # Add optional parameters if they are provided
-    if convert_type is not None:
-        params["convert_type"] = str(convert_type)
-    if cat_id is not None:
-        params["cat_id"] = str(cat_id)
-    if attribute_id is not None:
-        params["attribute_id"] = str(attribute_id)
-    if attribute_value_id is not None:
-        params["attribute_value_id"] = str(attribute_value_id)
-
-    # Generate the signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    import requests
+    # Fall back to the environment for credentials that were not passed in
+    APP_KEY = app_key or os.getenv('APP_KEY')
+    APP_SECRET = app_secret or os.getenv('APP_SECRET')
+    ACCESS_TOKEN = access_token or os.getenv('ACCESS_TOKEN')
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
+
+    # Build and sign the request from the endpoint registry
+    endpoint = get_endpoint("category.id.mapping")
+    params = client.prepare(endpoint, convert_type=convert_type, cat_id=cat_id,
+                            attribute_id=attribute_id, attribute_value_id=attribute_value_id)
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -89,13 +58,13 @@ def get_category_mapping(
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": f"{ALIBABA_SERVER_CALL_ENTRY}",
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {k: v for k, v in params.items() if k not in ['app_key', 'access_token', 'sign']}
     }
 
     try:
         # Make the POST request
-        response = requests.post(f"{ALIBABA_SERVER_CALL_ENTRY}{API_OPERATION}", data=params, headers=headers)
+        response = client.post(params, path=endpoint.post_path, use_cache=use_cache)
         
         # Handle the response
         response_data = response.json()
@@ -126,19 +95,94 @@ def get_category_mapping(
         print(f"\nRequest error: {e}")
         return None
 
+def preload_from_file(file_path, table, concurrency=10, app_key=None, app_secret=None, access_token=None):
+    """
+    Load every mapping needed by the rows of a CSV with cat_id and optional
+    attribute_id / attribute_value_id columns into the local table.
+
+    Credentials default to APP_KEY, APP_SECRET and ACCESS_TOKEN from the environment.
+    """
+    APP_KEY = app_key or os.getenv('APP_KEY')
+    APP_SECRET = app_secret or os.getenv('APP_SECRET')
+    ACCESS_TOKEN = access_token or os.getenv('ACCESS_TOKEN')
+
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        keys = mapping_requests(csv.DictReader(f))
+    print(f"{len(keys)} mappings needed, {sum(1 for key in keys if key in table)} already in the local table")
+
+    async def run():
+        async with AsyncGopClient(APP_KEY, APP_SECRET, ACCESS_TOKEN, max_concurrency=concurrency) as client:
+            return await preload_mappings(client, table, keys)
+
+    fetched, failed = asyncio.run(run())
+    print(f"Fetched {fetched} mappings; the local table now holds {len(table)}")
+    if failed:
+        print(f"{len(failed)} mappings failed: {failed[:20]}")
+    return failed
+
 def main():
-    # Example usage
+    parser = argparse.ArgumentParser(description='Map category, attribute and attribute value IDs')
+    parser.add_argument('--convert_type', type=int, choices=[1, 2, 3], help='1: category, 2: attribute, 3: attribute value')
+    parser.add_argument('--cat_id', type=int, help='Category ID')
+    parser.add_argument('--attribute_id', type=int, help='Attribute ID')
+    parser.add_argument('--attribute_value_id', type=int, help='Attribute value ID')
+    parser.add_argument('--preload', type=str,
+                        help='CSV with cat_id[, attribute_id, attribute_value_id] columns; loads every mapping it needs')
+    parser.add_argument('--concurrency', type=int, default=10, help='Mapping requests in flight while preloading (default: 10)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore the local mapping table and response cache')
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    load_env()
+
+    table = CategoryIdMappingTable()
+    # Only needed once the API is called; a local table hit works without them
+    has_credentials = all([os.getenv('APP_KEY'), os.getenv('APP_SECRET'), os.getenv('ACCESS_TOKEN')])
+
+    if args.preload:
+        if not has_credentials:
+            print("\nMissing required environment variables. Please check your .env file.")
+            print("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+            return 1
+        failed = preload_from_file(args.preload, table, args.concurrency)
+        print_cache_summary()
+        return 1 if failed else 0
+
+    if args.convert_type is None:
+        parser.error("--convert_type is required unless --preload is given")
+
+    # Answer from the local table when the mapping was loaded before
+    key = mapping_key(args.convert_type, args.cat_id, args.attribute_id, args.attribute_value_id)
+    if not args.no_cache and key in table:
+        print("Mapping found in the local mapping table:")
+        print(json.dumps(table.lookup(*key), indent=2))
+        return
+
+    if not has_credentials:
+        print("\nMissing required environment variables. Please check your .env file.")
+        print("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+
     response = get_category_mapping(
-        convert_type=1,  # 1 for category mapping
-        cat_id=123456    # Replace with actual category ID
+        convert_type=args.convert_type,
+        cat_id=args.cat_id,
+        attribute_id=args.attribute_id,
+        attribute_value_id=args.attribute_value_id,
+        use_cache=not args.no_cache
     )
-    
-    if response and response.get("result", {}).get("success"):
+
+    result = parse_mapping(response)
+    if result is not None:
+        table.store({key: result})
         print("Mapping successful!")
         print(json.dumps(response, indent=2))
     else:
         print("Mapping failed!")
         print(json.dumps(response, indent=2))
 
+    # Show how much of this run the local response cache answered
+    print_cache_summary()
+    return 0 if result is not None else 1
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+from utils.async_gop_client import AsyncGopClient
+from utils.category_tree import DEFAULT_TREE_PATH, crawl_categories, save_category_tree, load_category_tree
+from utils.env import load_env
+
+def build_tree(app_key, app_secret, access_token, concurrency, tree_path):
+    """Crawl the whole category tree from the root and store it locally; returns None if any category failed"""
+    async def run():
+        async with AsyncGopClient(app_key, app_secret, access_token, max_concurrency=concurrency) as client:
+            return await crawl_categories(client)
+
+    started = time.time()
+    categories, failed = asyncio.run(run())
+    if failed:
+        # A partial tree would silently drop whole subtrees, so the previous store is kept
+        print_error(f"\n{len(failed)} categories could not be fetched: {', '.join(str(cat_id) for cat_id in failed[:20])}")
+        print_warning(f"Left {tree_path} unchanged; run the build again to retry")
+        return None
+    save_category_tree(categories, tree_path)
+
+    leaves = sum(1 for category in categories.values() if category["leaf"])
+    print_success(f"\nStored {len(categories)} categories ({leaves} leaves) in {time.time() - started:.1f}s")
+    print_info(f"Category tree saved to {tree_path}")
+    return categories
+
+def show_category(tree, cat_id):
+    category = tree.get(cat_id)
+    if category is None:
+        print_error(f"Category {cat_id} is not in the local tree")
+        return
+    print_header(f"\n=== Category {cat_id} ===")
+    print_info(f"Name: {category['name']}")
+    print_info(f"Path: {tree.path_names(cat_id)}")
+    print_info(f"Path IDs: {' > '.join(str(path_id) for path_id in tree.path(cat_id))}")
+    print_info(f"Top-level category: {tree.top_level(cat_id)}")
+    print_info(f"Parent ID: {category['parent_id']}")
+    print_info(f"Depth: {category['depth']}")
+    print_info(f"Leaf: {category['leaf']}")
+    if category['children']:
+        print_info(f"Children: {', '.join(str(child_id) for child_id in category['children'])}")
+        print_info(f"Descendants: {len(tree.descendants(cat_id))} ({len(tree.leaves(cat_id))} leaves)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query an offline copy of the product category tree')
+    parser.add_argument('--build', action='store_true', help='Crawl the full category tree from the root and store it locally')
+    parser.add_argument('--concurrency', type=int, default=10, help='Category requests in flight while building (default: 10)')
+    parser.add_argument('--cat_id', type=int, action='append', help='Category ID to look up in the local tree (repeatable)')
+    parser.add_argument('--tree', type=str, default=DEFAULT_TREE_PATH, help=f'Local tree store (default: {DEFAULT_TREE_PATH})')
+    args = parser.parse_args()
+
+    if args.build:
+        # Load environment variables from .env file
+        load_env()
+
+        APP_KEY = os.getenv('APP_KEY')
+        APP_SECRET = os.getenv('APP_SECRET')
+        ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
+
+        if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+            print_error("Missing required environment variables")
+            return 1
+
+        print_header("\n=== Building Category Tree ===")
+        if build_tree(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.concurrency, args.tree) is None:
+            return 1
+
+    if args.cat_id:
+        tree = load_category_tree(args.tree)
+        if tree is None:
+            print_error(f"No category tree at {args.tree}; run with --build first")
+            return 1
+        print_info(f"Using category tree built at {tree.built_at} ({len(tree)} categories)")
+        for cat_id in args.cat_id:
+            show_category(tree, cat_id)
+    elif not args.build:
+        parser.print_help()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,58 +1,18 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import Colors, print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, get_client
+from utils.env import load_env
 
 def fetch_product_details(product_id, app_key, app_secret, access_token, website=None):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/get"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Create the product_get_request object
-    product_get_request = {
-        "productId": int(product_id)
-    }
-    
-    # Add website if specified
-    if website:
-        product_get_request["webSite"] = website
-
-    # Prepare the base request parameters
-    params = {
-        "app_key": app_key,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": str(int(time.time() * 1000)),
-        "format": "json",
-        "method": API_OPERATION,  # Use consistent API operation path
-        "product_get_request": json.dumps(product_get_request)
-    }
-
-    # Generate the signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("product.get", product_id=product_id, website=website)
 
     try:
         url = ALIBABA_SERVER_CALL_ENTRY
@@ -61,7 +21,7 @@ def fetch_product_details(product_id, app_key, app_secret, access_token, website
         if website:
             print_info(f"Website: {website}")
         
-        response = requests.post(url, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
         
         response_data = response.json()
@@ -142,6 +102,9 @@ def main():
     parser.add_argument('--website', type=str, choices=['ICBU', 'ALIEXPRESS'], help='Website to fetch product from (ICBU or ALIEXPRESS)')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -150,7 +113,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Fetching Product Details ===")
     print_info(f"Product ID: {args.product_id}")
@@ -170,9 +133,11 @@ def main():
             print_success(f"Response data has been saved to {output_file}")
         else:
             print_error("Failed to save response data")
+            return 1
     else:
         print_error("Failed to fetch product details")
         print_info("Please check the product ID and try again")
+        return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,62 +1,24 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.env import load_env
 
 def add_product_to_group(app_key, app_secret, access_token, product_id, group_id):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/group/add"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Create request object
-    request_obj = {
-        "productIds": [str(product_id)],
-        "groupId": str(group_id)
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "request": json.dumps(request_obj)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("product.group.add", product_ids=[product_id], group_id=group_id)
 
     try:
         print_info("\nSending request to Alibaba API...")
         print_info(f"Adding product {product_id} to group {group_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         response_data = response.json()
 
         # Prepare logging
@@ -69,7 +31,7 @@ def add_product_to_group(app_key, app_secret, access_token, product_id, group_id
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -121,6 +83,9 @@ def main():
     parser.add_argument('--group_id', type=str, required=True, help='Group ID to add product to')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -129,10 +94,11 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     # Make the API call
-    add_product_to_group(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id, args.group_id)
+    if not add_product_to_group(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id, args.group_id):
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
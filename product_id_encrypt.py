@@ -1,58 +1,50 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
+import csv
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
+import asyncio
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
-
-def encrypt_product_id(app_key, app_secret, access_token, product_id, convert_type):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/alibaba/icbu/product/id/encrypt"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "convert_type": str(convert_type),  # 1: original ID to encrypted ID, 2: encrypted ID to original ID
-        "product_id": str(product_id)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.async_gop_client import AsyncGopClient
+from utils.product_id_map import ProductIdMap
+from utils.endpoints import get_endpoint
+from utils.env import load_env
+
+# IDs converted per chunk in bulk mode; each chunk is saved to the ID map as it completes
+CHUNK_SIZE = 100
+
+def parse_converted_id(response_data):
+    """Return the converted ID from an id/encrypt response, or None if the conversion failed"""
+    result = get_endpoint("product.id.encrypt").parse(response_data)
+    if isinstance(result, dict) and result.get('success', False):
+        return result.get('id')
+    return None
+
+def encrypt_product_id(app_key, app_secret, access_token, product_id, convert_type, id_map=None):
+    import requests
+    operation_type = "encrypt" if convert_type == "1" else "decrypt"
+
+    # The conversion never changes, so a previously converted ID needs no request
+    if id_map is not None:
+        converted_id = id_map.lookup(product_id, convert_type)
+        if converted_id is not None:
+            print_success(f"\nFound {operation_type}ed product ID in the local ID map")
+            print_info(f"Original ID: {product_id}")
+            print_info(f"Converted ID: {converted_id}")
+            return converted_id
+
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("product.id.encrypt", convert_type=convert_type, product_id=product_id)
 
     try:
         print_info("\nSending request to Alibaba API...")
-        operation_type = "encrypt" if convert_type == "1" else "decrypt"
         print_info(f"{operation_type.capitalize()}ing product ID: {product_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -65,7 +57,7 @@ def encrypt_product_id(app_key, app_secret, access_token, product_id, convert_ty
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -96,9 +88,10 @@ def encrypt_product_id(app_key, app_secret, access_token, product_id, convert_ty
 
             # Handle response
             if response.status_code == 200:
-                if response_data.get('result', {}).get('success', False):
-                    result = response_data.get('result', {})
-                    converted_id = result.get('id')
+                converted_id = parse_converted_id(response_data)
+                if converted_id is not None:
+                    if id_map is not None:
+                        id_map.add(product_id, converted_id, convert_type)
                     print_success(f"\nSuccessfully {operation_type}ed product ID")
                     print_info(f"Original ID: {product_id}")
                     print_info(f"Converted ID: {converted_id}")
@@ -123,13 +116,86 @@ def encrypt_product_id(app_key, app_secret, access_token, product_id, convert_ty
         print_error(f"\nRequest error: {e}")
         return None
 
+def read_product_ids(file_path):
+    """Read product IDs from a file, one per line (a CSV header or extra columns are ignored)"""
+    product_ids = []
+    seen = set()
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            value = line.split(',')[0].strip().strip('"')
+            # Skip blanks, duplicates and a header row such as "Product ID"
+            if not value.isalnum() or not any(char.isdigit() for char in value) or value in seen:
+                continue
+            seen.add(value)
+            product_ids.append(value)
+    return product_ids
+
+def convert_product_ids(app_key, app_secret, access_token, product_ids, convert_type, id_map, concurrency=10,
+                        chunk_size=CHUNK_SIZE):
+    """
+    Convert many IDs, sending requests only for IDs missing from id_map.
+
+    Missing IDs are converted concurrently, chunk_size at a time, and each
+    chunk's successful results are stored in id_map as soon as it finishes.
+    Each ID is converted at most once, and an interrupted run loses at most
+    one chunk, so a rerun only converts the IDs that are still missing.
+
+    Returns:
+        dict: {product_id: converted_id or None if the conversion failed}
+    """
+    results = id_map.lookup_many(product_ids, convert_type)
+    missing = [product_id for product_id in product_ids if product_id not in results]
+    print_info(f"{len(results)} IDs found in the local ID map, {len(missing)} to convert")
+
+    if missing:
+        async def run():
+            async with AsyncGopClient(app_key, app_secret, access_token, max_concurrency=concurrency) as client:
+                for start in range(0, len(missing), chunk_size):
+                    chunk = missing[start:start + chunk_size]
+                    responses = await client.gather(client.product_id_encrypt(product_id, convert_type)
+                                                    for product_id in chunk)
+                    converted = {}
+                    for product_id, response_data in zip(chunk, responses):
+                        converted_id = None if isinstance(response_data, Exception) else parse_converted_id(response_data)
+                        if converted_id is None:
+                            print_error(f"Failed to convert product ID {product_id}: {response_data}")
+                        else:
+                            converted[product_id] = converted_id
+                    id_map.add_many(converted, convert_type)
+                    results.update(converted)
+                    print_info(f"Converted {start + len(chunk)}/{len(missing)} IDs")
+
+        asyncio.run(run())
+
+    return {product_id: results.get(product_id) for product_id in product_ids}
+
+def save_conversions(conversions, convert_type):
+    """Write the bulk conversion results to a CSV under api_logs and return its path"""
+    log_dir = 'api_logs'
+    os.makedirs(log_dir, exist_ok=True)
+    timestamp_str = datetime.now().strftime("%Y%m%d%H%M%S")
+    operation_type = "encrypt" if convert_type == "1" else "decrypt"
+    output_path = os.path.join(log_dir, f"product_id_{operation_type}_{timestamp_str}.csv")
+    with open(output_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['product_id', 'converted_id'])
+        for product_id, converted_id in conversions.items():
+            writer.writerow([product_id, converted_id or ''])
+    return output_path
+
 def main():
     parser = argparse.ArgumentParser(description='Convert between original and encrypted product IDs')
-    parser.add_argument('--product_id', type=str, required=True, help='Product ID to convert')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--product_id', type=str, help='Product ID to convert')
+    source.add_argument('--file', type=str, help='File of product IDs to convert in bulk, one per line')
     parser.add_argument('--convert_type', type=str, choices=['1', '2'], required=True,
                       help='1: Convert original ID to encrypted ID, 2: Convert encrypted ID to original ID')
+    parser.add_argument('--concurrency', type=int, default=10, help='Conversions in flight in bulk mode (default: 10)')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -138,15 +204,28 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Product ID Conversion ===")
     operation = "Encryption" if args.convert_type == "1" else "Decryption"
     print_info(f"Operation: {operation}")
+    id_map = ProductIdMap()
+
+    if args.file:
+        product_ids = read_product_ids(args.file)
+        print_info(f"Product IDs: {len(product_ids)} from {args.file}")
+        conversions = convert_product_ids(APP_KEY, APP_SECRET, ACCESS_TOKEN, product_ids, args.convert_type,
+                                          id_map, args.concurrency)
+        converted = sum(1 for converted_id in conversions.values() if converted_id)
+        print_success(f"\nConverted {converted}/{len(conversions)} product IDs")
+        print_success(f"Results saved to {save_conversions(conversions, args.convert_type)}")
+        return 0 if converted == len(conversions) else 1
+
     print_info(f"Product ID: {args.product_id}")
 
     # Make the API call
-    encrypt_product_id(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id, args.convert_type)
+    if encrypt_product_id(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id, args.convert_type, id_map) is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
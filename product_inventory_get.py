@@ -1,61 +1,24 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.env import load_env
 
 def get_product_inventory(app_key, app_secret, access_token, product_id):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/inventory/get"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Create the inventory request object
-    inventory_request = {
-        "productId": str(product_id)
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "inventory_get_request": json.dumps(inventory_request)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("inventory.get", product_id=product_id)
 
     try:
         print_info("\nSending request to Alibaba API...")
         print_info(f"Getting inventory for product ID: {product_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -68,7 +31,7 @@ def get_product_inventory(app_key, app_secret, access_token, product_id):
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -146,6 +109,9 @@ def main():
     parser.add_argument('--product_id', type=str, required=True, help='Product ID to get inventory for')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -154,13 +120,14 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Getting Product Inventory ===")
     print_info(f"Product ID: {args.product_id}")
 
     # Make the API call
-    get_product_inventory(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id)
+    if get_product_inventory(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id) is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,68 +1,19 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.endpoints import inventory_item
+from utils.env import load_env
 
 def update_product_inventory(app_key, app_secret, access_token, product_id, sku_id, quantity, multiple=False):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/inventory/update"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Create inventory update request object
-    inventory_item = {
-        "productId": str(product_id),
-        "skuId": str(sku_id),
-        "inventory": {
-            "amount": str(quantity)
-        }
-    }
-
-    # If multiple is True, use amountDiff for relative change
-    if multiple:
-        inventory_item["inventory"]["amountDiff"] = str(quantity)
-        del inventory_item["inventory"]["amount"]
-
-    inventory_update_request = {
-        "inventoryItems": [inventory_item]
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "inventory_update_request": json.dumps(inventory_update_request)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("inventory.update", items=[inventory_item(product_id, sku_id, quantity, multiple)])
 
     try:
         print_info("\nSending request to Alibaba API...")
@@ -72,7 +23,7 @@ def update_product_inventory(app_key, app_secret, access_token, product_id, sku_
         else:
             print_info(f"Setting quantity to: {quantity}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -85,7 +36,7 @@ def update_product_inventory(app_key, app_secret, access_token, product_id, sku_
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -153,6 +104,9 @@ def main():
     parser.add_argument('--adjust', action='store_true', help='Adjust quantity relatively (add/subtract) instead of setting absolute value')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -161,7 +115,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Updating Product Inventory ===")
     print_info(f"Product ID: {args.product_id}")
@@ -172,7 +126,8 @@ def main():
         print_info(f"Setting quantity to: {args.quantity}")
 
     # Make the API call
-    update_product_inventory(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id, args.sku_id, args.quantity, args.adjust)
+    if not update_product_inventory(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.product_id, args.sku_id, args.quantity, args.adjust):
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,12 +1,11 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
 import argparse
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.endpoints import get_endpoint
+from utils.env import load_env
 
 # Color codes for terminal output
 class Colors:
@@ -33,24 +32,6 @@ def print_warning(msg):
 def print_header(msg):
     print(f"{Colors.BOLD}{Colors.CYAN}{msg}{Colors.ENDC}")
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Function to generate the signature with SHA-256
-def generate_signature(params, secret_key, api_operation):
-    # Step 1: Sort all request parameters
-    sorted_params = sorted(params.items())
-
-    # Step 2: Concatenate the sorted parameters and their values into a string
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-
-    # Step 3: Generate HMAC SHA-256
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-
-    return hashed
-
 def display_usage_samples():
     """Display sample usage of the script with various parameters"""
     print_header("\n=== Sample Usage ===")
@@ -79,6 +60,7 @@ def display_usage_samples():
 
 # Example usage of the signature generation function
 def main():
+    import requests
     # Set up argument parser
     parser = argparse.ArgumentParser(description='Fetch product list from Alibaba API with colored output')
     parser.add_argument('--current_page', type=int, help='Current page number')
@@ -100,63 +82,36 @@ def main():
         display_usage_samples()
         return
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve parameters from environment
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/alibaba/icbu/product/list"  # API operation endpoint for GOP protocol
 
-    # Prepare the base request parameters
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": str(int(time.time() * 1000)),
-        "filter_type": "onSelling"
-    }
-
-    # Add optional parameters if they are provided
-    if args.current_page:
-        params["current_page"] = str(args.current_page)
-    else:
-        params["current_page"] = "1"  # Default value
-        
-    if args.page_size:
-        params["page_size"] = str(args.page_size)
-    else:
-        params["page_size"] = "20"  # Default value
-        
-    if args.subject:
-        params["subject"] = args.subject
-    if args.gmt_modified_from:
-        params["gmt_modified_from"] = args.gmt_modified_from
-    if args.gmt_modified_to:
-        params["gmt_modified_to"] = args.gmt_modified_to
-    if args.group_id1:
-        params["group_id1"] = str(args.group_id1)
-    if args.group_id2:
-        params["group_id2"] = str(args.group_id2)
-    if args.group_id3:
-        params["group_id3"] = str(args.group_id3)
-    if args.id:
-        params["id"] = str(args.id)
-    if args.category_id:
-        params["category_id"] = str(args.category_id)
-
-    # Generate the signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-
-    # Add the generated signature to the params dictionary
-    params['sign'] = signature
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',  # Use Protocol.GOP
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("\nMissing required environment variables. Please check your .env file.")
+        print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
+
+    # Build and sign the request from the endpoint registry; unset options are left out
+    # and current_page/page_size fall back to the endpoint defaults (1 and 20)
+    endpoint = get_endpoint("product.list")
+    params = client.prepare(
+        endpoint,
+        current_page=args.current_page or None,
+        page_size=args.page_size or None,
+        subject=args.subject or None,
+        gmt_modified_from=args.gmt_modified_from or None,
+        gmt_modified_to=args.gmt_modified_to or None,
+        group_id1=args.group_id1 or None,
+        group_id2=args.group_id2 or None,
+        group_id3=args.group_id3 or None,
+        id=args.id or None,
+        category_id=args.category_id or None
+    )
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -169,7 +124,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": f"{ALIBABA_SERVER_CALL_ENTRY}",
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {key: value for key, value in params.items() 
                               if key not in ['app_key', 'access_token', 'sign']}
     }
@@ -245,7 +200,7 @@ def main():
     try:
         # Make the POST request
         print_info("\nSending request to Alibaba API...")
-        response = requests.post(f"{ALIBABA_SERVER_CALL_ENTRY}{API_OPERATION}", data=params, headers=headers)
+        response = client.post(params, path=endpoint.post_path)
         
         # Handle the response
         response_data = response.json()
@@ -282,9 +237,13 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print_success(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) else 1
 
     except requests.exceptions.RequestException as e:
         print_error(f"\nRequest error: {e}")
+        status = 1
+
+    return status
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
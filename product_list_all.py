@@ -1,37 +1,121 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
+import math
+import asyncio
 import json
 from datetime import datetime
 import argparse
 from utils.terminal_colors import Colors, print_success, print_error, print_info, print_warning, print_header
+from utils.gop_client import get_client
+from utils.rate_limiter import get_rate_limiter
+from utils.async_gop_client import AsyncGopClient
+from utils.product_stream import ProductStreamWriter
+from utils.crawl_checkpoint import load_checkpoint, save_checkpoint, clear_checkpoint
+from utils.endpoints import get_endpoint
+from utils.env import load_env
 
-# Load environment variables from .env file
-load_dotenv()
+CHECKPOINT_FILE = os.path.join('api_logs', 'crawl_checkpoint_all_products.json')
+LIST_ENDPOINT = get_endpoint("product.list")
 
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
-
-def fetch_products(params, headers, api_operation, server_url, app_secret):
-    # Generate the signature
-    signature = generate_signature(params, app_secret, api_operation)
-    params['sign'] = signature
+def fetch_products(client, params):
+    import requests
+    # Sign the request
+    signed_params = client.build_params(LIST_ENDPOINT.path, params)
 
     try:
-        response = requests.post(f"{server_url}{api_operation}", data=params, headers=headers)
+        response = client.post(signed_params, path=LIST_ENDPOINT.post_path)
         return response.json()
     except requests.exceptions.RequestException as e:
         print_error(f"\nRequest error: {e}")
         return None
 
+def build_list_params(args, current_page, page_size):
+    # Build the unsigned request parameters from the endpoint registry; unset filters are left out
+    return LIST_ENDPOINT.build(
+        current_page=current_page,
+        page_size=page_size,
+        schema_custom_fields="model,4sgm_SKU",  # Request custom fields
+        subject=args.subject or None,
+        gmt_modified_from=args.gmt_modified_from or None,
+        gmt_modified_to=args.gmt_modified_to or None,
+        group_id1=args.group_id1 or None,
+        group_id2=args.group_id2 or None,
+        group_id3=args.group_id3 or None,
+        category_id=args.category_id or None
+    )
+
+async def fetch_pages_concurrently(async_client, args, pages, page_size, on_page):
+    """
+    Fetch the given pages concurrently, handing each response to on_page in page order.
+
+    At most the client's max_concurrency requests are in flight at once, and
+    the shared rate limiter paces when each one is sent. A page is handed over
+    as soon as it and all earlier pages have arrived, so only out-of-order
+    pages are buffered.
+    """
+    async def fetch_page(page):
+        print_info(f"Fetching page {page}...")
+        return await async_client.call(LIST_ENDPOINT.path, build_list_params(args, page, page_size), path=LIST_ENDPOINT.post_path)
+
+    tasks = [asyncio.ensure_future(fetch_page(page)) for page in pages]
+    for page, task in zip(pages, tasks):
+        try:
+            response_data = await task
+        except Exception as e:
+            response_data = e
+        on_page(page, response_data)
+
+def fetch_all_concurrently(client, args, page_size, writer, start_page, record_progress):
+    """
+    Fetch start_page to learn total_item, then fan the remaining pages out concurrently.
+
+    Products are appended to writer in page order. record_progress(page) is
+    called after each page as long as every earlier page succeeded, so the
+    checkpoint never skips over a failed page.
+
+    Returns:
+        list: Page numbers that failed
+    """
+    print_info(f"\nFetching page {start_page}...")
+    first_page = fetch_products(client, build_list_params(args, start_page, page_size))
+    if not first_page or 'result' not in first_page:
+        print_error("Failed to fetch products")
+        return [start_page]
+
+    page_products = first_page['result'].get('products', [])
+    writer.write_products(page_products)
+    record_progress(start_page)
+    total_count = first_page['result'].get('total_item', 0)
+    total_pages = math.ceil(total_count / page_size)
+    print_success(f"Retrieved {len(page_products)} products from page {start_page}")
+    print_info(f"Total: {total_count} products in {total_pages} pages")
+
+    pages = list(range(start_page + 1, total_pages + 1))
+    if not pages:
+        return []
+
+    print_info(f"Fetching {len(pages)} remaining pages with {args.concurrency} workers")
+
+    failed_pages = []
+
+    def on_page(page, response_data):
+        if isinstance(response_data, Exception) or not response_data or 'result' not in response_data:
+            print_error(f"Failed to fetch page {page}: {response_data}")
+            failed_pages.append(page)
+            return
+        writer.write_products(response_data['result'].get('products', []))
+        if not failed_pages:
+            record_progress(page)
+        print_info(f"Progress: {writer.count}/{total_count} products")
+
+    async def run():
+        async with AsyncGopClient(client.app_key, client.app_secret, client.access_token,
+                                  max_concurrency=args.concurrency) as async_client:
+            await fetch_pages_concurrently(async_client, args, pages, page_size, on_page)
+
+    asyncio.run(run())
+    return failed_pages
+
 def main():
     parser = argparse.ArgumentParser(description='Fetch ALL products from Alibaba API with pagination')
     parser.add_argument('--subject', type=str, help='Subject of product')
@@ -41,21 +125,32 @@ def main():
     parser.add_argument('--group_id2', type=int, help='Group ID 2')
     parser.add_argument('--group_id3', type=int, help='Group ID 3')
     parser.add_argument('--category_id', type=int, help='Category ID')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Number of pages to fetch in parallel once the page count is known (default: 1, sequential)')
+    parser.add_argument('--rate', type=float,
+                        help='Maximum page requests per second (default: the configured limit for the product list endpoint)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted crawl from its checkpoint instead of starting at page 1')
+    parser.add_argument('--checkpoint', type=str, default=CHECKPOINT_FILE,
+                        help=f'Checkpoint file tracking crawl progress (default: {CHECKPOINT_FILE})')
     
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve parameters from environment
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/alibaba/icbu/product/list"
 
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("\nMissing required environment variables. Please check your .env file.")
+        print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
+    if args.rate:
+        get_rate_limiter().set_rate(LIST_ENDPOINT.path, args.rate)
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -65,91 +160,101 @@ def main():
     # Initialize variables for pagination
     current_page = 1
     page_size = 30
-    total_products = []
+
+    # Products are streamed to a JSON Lines file as each page arrives
+    query_parameters = build_list_params(args, current_page, page_size)
+    del query_parameters["current_page"]
+
+    if args.resume:
+        checkpoint = load_checkpoint(args.checkpoint)
+        if not checkpoint:
+            print_error(f"No checkpoint found at {args.checkpoint}")
+            return 1
+        if checkpoint['query_parameters'] != query_parameters:
+            print_error("Checkpoint was created with different query parameters:")
+            print_error(json.dumps(checkpoint['query_parameters']))
+            return 1
+        output_file = checkpoint['output_file']
+        current_page = checkpoint['last_completed_page'] + 1
+        writer = ProductStreamWriter(output_file, resume_offset=checkpoint['output_offset'])
+        print_info(f"Resuming {output_file} from page {current_page} ({writer.count} products already saved)")
+    else:
+        output_file = os.path.join(log_dir, f"all_products_{timestamp_str}.jsonl")
+        writer = ProductStreamWriter(output_file, query_parameters)
+
+    def record_progress(page):
+        save_checkpoint(args.checkpoint, {
+            "output_file": output_file,
+            "query_parameters": query_parameters,
+            "last_completed_page": page,
+            "output_offset": writer.offset,
+            "total_products": writer.count,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
     
     print_header("\n=== Fetching All Products ===")
     print_info("Page size: 30 products per page")
 
+    if args.concurrency > 1:
+        failed_pages = fetch_all_concurrently(client, args, page_size, writer, current_page, record_progress)
+        if failed_pages:
+            print_warning(f"Failed pages: {', '.join(str(page) for page in failed_pages)}")
+            print_info("Run again with --resume to retry from the first failed page")
+        else:
+            print_success(f"\nCompleted! Retrieved {writer.count} products")
+            clear_checkpoint(args.checkpoint)
+        writer.close(failed_pages=failed_pages, duplicates_skipped=writer.skipped)
+        print_success(f"Products saved to {output_file}")
+        return 1 if failed_pages else 0
+
+    completed = False
     while True:
-        # Prepare the base request parameters
-        params = {
-            "app_key": APP_KEY,
-            "format": "json",
-            "method": API_OPERATION,
-            "access_token": ACCESS_TOKEN,
-            "sign_method": "sha256",
-            "timestamp": str(int(time.time() * 1000)),
-            "filter_type": "onSelling",
-            "current_page": str(current_page),
-            "page_size": str(page_size),
-            "schema_custom_fields": "model,4sgm_SKU"  # Request custom fields
-        }
-
-        # Add optional parameters if they are provided
-        if args.subject:
-            params["subject"] = args.subject
-        if args.gmt_modified_from:
-            params["gmt_modified_from"] = args.gmt_modified_from
-        if args.gmt_modified_to:
-            params["gmt_modified_to"] = args.gmt_modified_to
-        if args.group_id1:
-            params["group_id1"] = str(args.group_id1)
-        if args.group_id2:
-            params["group_id2"] = str(args.group_id2)
-        if args.group_id3:
-            params["group_id3"] = str(args.group_id3)
-        if args.category_id:
-            params["category_id"] = str(args.category_id)
+        params = build_list_params(args, current_page, page_size)
 
         print_info(f"\nFetching page {current_page}...")
         
         # Make the API call
-        response_data = fetch_products(params, headers, API_OPERATION, ALIBABA_SERVER_CALL_ENTRY, APP_SECRET)
+        response_data = fetch_products(client, params)
         
         if not response_data or 'result' not in response_data:
             print_error("Failed to fetch products")
+            print_info("Run again with --resume to continue from this page")
             break
 
         # Extract products from the response
         if 'products' in response_data['result']:
             page_products = response_data['result']['products']
-            total_products.extend(page_products)
+            writer.write_products(page_products)
+            record_progress(current_page)
             print_success(f"Retrieved {len(page_products)} products from page {current_page}")
             
             # Display total progress with correct key 'total_item'
             total_count = response_data['result']['total_item']
-            progress = (len(total_products) / total_count) * 100
-            print_info(f"Progress: {len(total_products)}/{total_count} products ({progress:.1f}%)")
+            progress = (writer.count / total_count) * 100 if total_count else 100.0
+            print_info(f"Progress: {writer.count}/{total_count} products ({progress:.1f}%)")
             
-            # Check if we've reached the end
-            if len(total_products) >= total_count:
-                print_success(f"\nCompleted! Retrieved all {len(total_products)} products")
+            # Check if we've reached the end (a short page is the last one even if
+            # duplicates were skipped along the way)
+            if writer.count >= total_count or len(page_products) < page_size:
+                print_success(f"\nCompleted! Retrieved all {writer.count} products")
+                completed = True
                 break
         else:
+            record_progress(current_page)
             # Only break if we're on page 4 and no products found
             if current_page == 4:
                 print_warning("No products found on page 4, stopping...")
+                completed = True
                 break
             print_warning("No products found on this page, continuing...")
 
         current_page += 1
-        
-        # Only sleep after page 3
-        if current_page > 3:
-            print_info("Waiting 15 seconds before next request...")
-            time.sleep(15)
-
-        # Save to a JSON file
-        output_file = os.path.join(log_dir, f"all_products_{timestamp_str}.json")
-        with open(output_file, 'w') as f:
-            json.dump({
-                "total_products": len(total_products),
-                "products": total_products,
-                "fetch_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "query_parameters": {k: v for k, v in params.items() if k not in ['app_key', 'access_token', 'sign']}
-            }, f, indent=4)
-        
-        print_success(f"Products saved to {output_file}")
+
+    if completed:
+        clear_checkpoint(args.checkpoint)
+    writer.close(last_page=current_page, duplicates_skipped=writer.skipped)
+    print_success(f"Products saved to {output_file}")
+    return 0 if completed else 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,26 +1,14 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.env import load_env
 
 def main():
+    import requests
     parser = argparse.ArgumentParser(description='Operate on photo bank groups (create/update/delete)')
     parser.add_argument('--operation', type=str, required=True, choices=['create', 'update', 'delete'],
                       help='Operation to perform on the group')
@@ -32,59 +20,34 @@ def main():
     # Validate arguments based on operation
     if args.operation in ['create', 'update'] and not args.group_name:
         print_error("group_name is required for create and update operations")
-        return
+        return 1
 
     if args.operation in ['update', 'delete'] and not args.group_id:
         print_error("group_id is required for update and delete operations")
-        return
+        return 1
+
+    # Load environment variables from .env file
+    load_env()
 
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/photobank/group/operate"
-
-    # Create request object based on operation
-    request_obj = {
-        "operation": args.operation
-    }
 
-    if args.operation == 'create':
-        request_obj.update({
-            "groupName": args.group_name,
-            "description": args.description if args.description else ""
-        })
-    elif args.operation == 'update':
-        request_obj.update({
-            "groupId": args.group_id,
-            "groupName": args.group_name,
-            "description": args.description if args.description else ""
-        })
-    else:  # delete
-        request_obj.update({
-            "groupId": args.group_id
-        })
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "request": json.dumps(request_obj)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
-
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("\nMissing required environment variables. Please check your .env file.")
+        print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare(
+        "photobank.group.operate",
+        operation=args.operation,
+        # create names a new group; delete only needs the group ID
+        group_id=args.group_id if args.operation != 'create' else None,
+        group_name=args.group_name if args.operation != 'delete' else None,
+        description=(args.description or "") if args.operation != 'delete' else None
+    )
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -96,7 +59,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": ALIBABA_SERVER_CALL_ENTRY,
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {
             key: value for key, value in params.items() 
             if key not in ['app_key', 'access_token', 'sign']
@@ -112,7 +75,7 @@ def main():
         else:
             print_info(f"Deleting group: {args.group_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         response_data = response.json()
 
         # Display summary of the response
@@ -159,9 +122,13 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print_success(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) and response_data.get('result', {}).get('success') else 1
 
     except requests.exceptions.RequestException as e:
         print_error(f"\nRequest error: {e}")
+        status = 1
+
+    return status
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,26 +1,14 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.env import load_env
 
 def main():
+    import requests
     parser = argparse.ArgumentParser(description='List images in photo bank group')
     parser.add_argument('--group_id', type=str, required=True, help='Group ID to list images from (required)')
     parser.add_argument('--current_page', type=int, default=1, help='Current page number (default: 1)')
@@ -31,50 +19,30 @@ def main():
     parser.add_argument('--gmt_modified_end', type=str, help='End time of image modification (format: yyyy-MM-dd HH:mm:ss)')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/photobank/list"
-
-    # Create request object
-    request_obj = {
-        "currentPage": args.current_page,
-        "pageSize": args.page_size
-    }
 
-    # Add optional parameters
-    if args.group_id:
-        request_obj["groupId"] = args.group_id
-    if args.gmt_create_start:
-        request_obj["gmtCreateStart"] = args.gmt_create_start
-    if args.gmt_create_end:
-        request_obj["gmtCreateEnd"] = args.gmt_create_end
-    if args.gmt_modified_start:
-        request_obj["gmtModifiedStart"] = args.gmt_modified_start
-    if args.gmt_modified_end:
-        request_obj["gmtModifiedEnd"] = args.gmt_modified_end
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "request": json.dumps(request_obj)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
-
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("\nMissing required environment variables. Please check your .env file.")
+        print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare(
+        "photobank.list",
+        current_page=args.current_page,
+        page_size=args.page_size,
+        group_id=args.group_id,
+        gmt_create_start=args.gmt_create_start,
+        gmt_create_end=args.gmt_create_end,
+        gmt_modified_start=args.gmt_modified_start,
+        gmt_modified_end=args.gmt_modified_end
+    )
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -86,7 +54,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": ALIBABA_SERVER_CALL_ENTRY,
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {
             key: value for key, value in params.items() 
             if key not in ['app_key', 'access_token', 'sign']
@@ -99,7 +67,7 @@ def main():
             print_info(f"Fetching images from group: {args.group_id}")
         print_info(f"Page {args.current_page}, Size: {args.page_size}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         response_data = response.json()
 
         # Display summary of the response
@@ -147,9 +115,13 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print_success(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) else 1
 
     except requests.exceptions.RequestException as e:
         print_error(f"\nRequest error: {e}")
+        status = 1
+
+    return status
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,25 +1,12 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 import mimetypes
-from dotenv import load_dotenv
 import json
 from datetime import datetime
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, get_client, is_success
+from utils.env import load_env
 
 def get_image_info(image_path):
     """Get image information like size and mime type"""
@@ -30,6 +17,7 @@ def get_image_info(image_path):
     return file_size, mime_type
 
 def main():
+    import requests
     parser = argparse.ArgumentParser(description='Upload image to Alibaba photo bank')
     parser.add_argument('--file_path', type=str, required=True, help='Path to the image file to upload')
     parser.add_argument('--group_id', type=str, required=True, help='Group ID to upload image to')
@@ -39,7 +27,7 @@ def main():
     # Validate file exists and is readable
     if not os.path.isfile(args.file_path):
         print_error(f"File not found: {args.file_path}")
-        return
+        return 1
     
     if not args.image_name:
         args.image_name = os.path.basename(args.file_path)
@@ -47,43 +35,27 @@ def main():
     # Get file information
     file_size, mime_type = get_image_info(args.file_path)
     
+    # Load environment variables from .env file
+    load_env()
+
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/alibaba/icbu/photobank/upload"
 
-    # Create request object
-    request_obj = {
-        "groupId": args.group_id,
-        "imageName": args.image_name
-    }
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("\nMissing required environment variables. Please check your .env file.")
+        print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
 
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "request": json.dumps(request_obj)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("photobank.upload", group_id=args.group_id, image_name=args.image_name)
 
     # Prepare file for upload
     files = {
         'file': (args.image_name, open(args.file_path, 'rb'), mime_type)
     }
 
-    headers = {
-        'X-Protocol': 'GOP'
-    }
-
     # Prepare logging
     log_dir = 'api_logs'
     os.makedirs(log_dir, exist_ok=True)
@@ -94,7 +66,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": ALIBABA_SERVER_CALL_ENTRY,
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": {'X-Protocol': 'GOP'},
         "Request Parameters": {
             key: value for key, value in params.items() 
             if key not in ['app_key', 'access_token', 'sign']
@@ -112,12 +84,7 @@ def main():
         print_info(f"File size: {file_size} bytes")
         print_info(f"Target group: {args.group_id}")
 
-        response = requests.post(
-            ALIBABA_SERVER_CALL_ENTRY,
-            data=params,
-            files=files,
-            headers=headers
-        )
+        response = client.post(params, files=files)
         
         response_data = response.json()
 
@@ -159,11 +126,15 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print_success(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) and response_data.get('success', False) else 1
 
     except requests.exceptions.RequestException as e:
         print_error(f"\nRequest error: {e}")
+        status = 1
     finally:
         files['file'][1].close()
 
+    return status
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
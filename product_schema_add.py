@@ -1,57 +1,29 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.schema_validator import validate_before_send
+from utils.env import load_env
+
+def add_product_schema(app_key, app_secret, access_token, cat_id, schema_data, validate=True):
+    import requests
+    # Catch missing or malformed fields before spending an API call
+    if validate and not validate_before_send(cat_id, schema_data):
+        return None
+
+    client = get_client(app_key, app_secret, access_token)
 
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
-
-def add_product_schema(app_key, app_secret, access_token, cat_id, schema_data):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/schema/add"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "cat_id": str(cat_id),
-        "schema_data": json.dumps(schema_data)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("schema.add", cat_id=cat_id, schema_data=schema_data)
 
     try:
         print_info("\nSending request to Alibaba API...")
         print_info(f"Adding schema for category ID: {cat_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -64,7 +36,7 @@ def add_product_schema(app_key, app_secret, access_token, cat_id, schema_data):
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -124,8 +96,12 @@ def main():
     parser = argparse.ArgumentParser(description='Add a new product schema')
     parser.add_argument('--cat_id', type=str, required=True, help='Category ID to add schema for')
     parser.add_argument('--schema_file', type=str, required=True, help='Path to JSON file containing schema data')
+    parser.add_argument('--skip-validation', action='store_true', help='Submit without checking the data against the locally stored category schema')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -134,7 +110,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     # Load schema data from file
     try:
@@ -142,14 +118,15 @@ def main():
             schema_data = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print_error(f"\nError loading schema file: {e}")
-        return
+        return 1
 
     print_header("\n=== Adding Product Schema ===")
     print_info(f"Category ID: {args.cat_id}")
     print_info(f"Schema File: {args.schema_file}")
 
     # Make the API call
-    add_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.cat_id, schema_data)
+    if add_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.cat_id, schema_data, validate=not args.skip_validation) is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,54 +1,20 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.schema_store import SchemaStore
+from utils.env import load_env
+from utils.response_cache import print_cache_summary
 
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
-
-def get_product_schema(app_key, app_secret, access_token, cat_id, schema_id=None):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/alibaba/icbu/product/schema/get"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "cat_id": str(cat_id)
-    }
-
-    # Add schema_id if provided
-    if schema_id:
-        params["schema_id"] = str(schema_id)
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+def get_product_schema(app_key, app_secret, access_token, cat_id, schema_id=None, use_cache=True):
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("schema.get", cat_id=cat_id, schema_id=schema_id or None)
 
     try:
         print_info("\nSending request to Alibaba API...")
@@ -57,7 +23,9 @@ def get_product_schema(app_key, app_secret, access_token, cat_id, schema_id=None
         else:
             print_info(f"Getting schema for category ID: {cat_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params, use_cache=use_cache)
+        if getattr(response, 'from_cache', False):
+            print_info("Served from the local response cache (use --no-cache to refresh)")
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -70,7 +38,7 @@ def get_product_schema(app_key, app_secret, access_token, cat_id, schema_id=None
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -111,11 +79,17 @@ def get_product_schema(app_key, app_secret, access_token, cat_id, schema_id=None
                     if 'catId' in result:
                         print_info(f"Category ID: {result['catId']}")
                     if 'schemaXml' in result:
-                        # Save schema XML to a separate file
-                        xml_file_path = os.path.join(log_dir, f"schema_xml_{timestamp_str}.xml")
-                        with open(xml_file_path, 'w', encoding='utf-8') as xml_file:
-                            xml_file.write(result['schemaXml'])
-                        print_info(f"Schema XML saved to: {xml_file_path}")
+                        # Keep one copy per distinct schema and record when it changes
+                        store = SchemaStore()
+                        stored = store.put(cat_id, result['schemaXml'], schema_id)
+                        if stored['changed'] and stored['previous_hash']:
+                            print_warning(f"Schema changed: now version {stored['version']}")
+                        elif stored['changed']:
+                            print_info(f"Schema stored as version {stored['version']}")
+                        else:
+                            print_info(f"Schema unchanged (version {stored['version']})")
+                        print_info(f"Schema XML saved to: {store.object_path(stored['hash'])}")
+                        store.close()
                     
                     print_success(f"Response logged to {log_file_path}")
                     return result
@@ -142,8 +116,12 @@ def main():
     parser = argparse.ArgumentParser(description='Get product schema details')
     parser.add_argument('--cat_id', type=str, required=True, help='Category ID to get schema for')
     parser.add_argument('--schema_id', type=str, help='Optional: Specific schema ID to retrieve')
+    parser.add_argument('--no-cache', action='store_true', help='Always query the API instead of the local response cache')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -152,7 +130,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Getting Product Schema ===")
     print_info(f"Category ID: {args.cat_id}")
@@ -160,7 +138,12 @@ def main():
         print_info(f"Schema ID: {args.schema_id}")
 
     # Make the API call
-    get_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.cat_id, args.schema_id)
+    schema = get_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.cat_id, args.schema_id, use_cache=not args.no_cache)
+
+    # Show how much of this run the local response cache answered
+    print_cache_summary()
+    if schema is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
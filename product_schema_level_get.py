@@ -1,61 +1,34 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
 import argparse
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.env import load_env
+from utils.response_cache import print_cache_summary
 
 def main():
+    import requests
     parser = argparse.ArgumentParser(description='Get product schema level from Alibaba API')
     parser.add_argument('category_id', help='The category ID to query')
+    parser.add_argument('--no-cache', action='store_true', help='Always query the API instead of the local response cache')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/schema/level/get"
-
-    # Create XML content for the request - proper formatting with line breaks
-    xml_content = f'''<?xml version="1.0" encoding="UTF-8"?>
-<request>
-    <cat_id>{args.category_id}</cat_id>
-</request>'''
 
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "language": "en_US",
-        "cat_id": args.category_id,
-        "xml": xml_content
-    }
-
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print("\nMissing required environment variables. Please check your .env file.")
+        print("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
 
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("schema.level.get", cat_id=args.category_id)
 
     log_dir = 'api_logs'
     os.makedirs(log_dir, exist_ok=True)
@@ -66,7 +39,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": ALIBABA_SERVER_CALL_ENTRY,
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {
             "format": params.get("format"),
             "method": params.get("method"),
@@ -77,8 +50,10 @@ def main():
     }
 
     try:
-        # Make the POST request to the base URL without appending the API_OPERATION
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        # Make the POST request to the base URL; this endpoint does not take its path in the URL
+        response = client.post(params, use_cache=not args.no_cache)
+        if getattr(response, 'from_cache', False):
+            print("Served from the local response cache (use --no-cache to refresh)")
         response_data = response.json()
 
         response_log = {
@@ -99,9 +74,15 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) else 1
 
     except requests.exceptions.RequestException as e:
         print(f"\nRequest error: {e}")
+        status = 1
+
+    # Show how much of this run the local response cache answered
+    print_cache_summary()
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
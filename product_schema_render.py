@@ -1,54 +1,19 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.env import load_env
+from utils.response_cache import print_cache_summary
 
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
-
-def render_product_schema(app_key, app_secret, access_token, schema_id, language=None):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/schema/render"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "schema_id": str(schema_id)
-    }
-
-    # Add optional language parameter if provided
-    if language:
-        params["language"] = language
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+def render_product_schema(app_key, app_secret, access_token, schema_id, language=None, use_cache=True):
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("schema.render", schema_id=schema_id, language=language or None)
 
     try:
         print_info("\nSending request to Alibaba API...")
@@ -56,7 +21,9 @@ def render_product_schema(app_key, app_secret, access_token, schema_id, language
         if language:
             print_info(f"Language: {language}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params, use_cache=use_cache)
+        if getattr(response, 'from_cache', False):
+            print_info("Served from the local response cache (use --no-cache to refresh)")
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -69,7 +36,7 @@ def render_product_schema(app_key, app_secret, access_token, schema_id, language
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -135,8 +102,12 @@ def main():
     parser = argparse.ArgumentParser(description='Render a product schema to get sample data structure')
     parser.add_argument('--schema_id', type=str, required=True, help='Schema ID to render')
     parser.add_argument('--language', type=str, help='Optional: Language for schema rendering (e.g., en_US)')
+    parser.add_argument('--no-cache', action='store_true', help='Always query the API instead of the local response cache')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -145,7 +116,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Rendering Product Schema ===")
     print_info(f"Schema ID: {args.schema_id}")
@@ -153,7 +124,12 @@ def main():
         print_info(f"Language: {args.language}")
 
     # Make the API call
-    render_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.schema_id, args.language)
+    rendered = render_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.schema_id, args.language, use_cache=not args.no_cache)
+
+    # Show how much of this run the local response cache answered
+    print_cache_summary()
+    if rendered is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,54 +1,18 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.env import load_env
 
 def render_product_schema_draft(app_key, app_secret, access_token, draft_id, language=None):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/schema/render/draft"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "draft_id": str(draft_id)
-    }
-
-    # Add optional language parameter if provided
-    if language:
-        params["language"] = language
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    import requests
+    client = get_client(app_key, app_secret, access_token)
+
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("schema.render.draft", draft_id=draft_id, language=language or None)
 
     try:
         print_info("\nSending request to Alibaba API...")
@@ -56,7 +20,7 @@ def render_product_schema_draft(app_key, app_secret, access_token, draft_id, lan
         if language:
             print_info(f"Language: {language}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -69,7 +33,7 @@ def render_product_schema_draft(app_key, app_secret, access_token, draft_id, lan
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -137,6 +101,9 @@ def main():
     parser.add_argument('--language', type=str, help='Optional: Language for schema rendering (e.g., en_US)')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -145,7 +112,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     print_header("\n=== Rendering Draft Product Schema ===")
     print_info(f"Draft ID: {args.draft_id}")
@@ -153,7 +120,8 @@ def main():
         print_info(f"Language: {args.language}")
 
     # Make the API call
-    render_product_schema_draft(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.draft_id, args.language)
+    if render_product_schema_draft(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.draft_id, args.language) is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,57 +1,31 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
 import json
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client
+from utils.schema_validator import validate_before_send
+from utils.env import load_env
+
+def update_product_schema(app_key, app_secret, access_token, schema_id, schema_data, cat_id=None, validate=True):
+    import requests
+    # The schema to validate against is looked up by category
+    if validate and not cat_id:
+        print_warning("Skipping local validation: pass --cat_id to check the data against the stored schema")
+    elif validate and not validate_before_send(cat_id, schema_data, schema_id):
+        return None
+
+    client = get_client(app_key, app_secret, access_token)
 
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
-
-def update_product_schema(app_key, app_secret, access_token, schema_id, schema_data):
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/schema/update"
-
-    # Define the headers
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": app_key,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": access_token,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "schema_id": str(schema_id),
-        "schema_data": json.dumps(schema_data)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, app_secret, API_OPERATION)
-    params['sign'] = signature
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("schema.update", schema_id=schema_id, schema_data=schema_data)
 
     try:
         print_info("\nSending request to Alibaba API...")
         print_info(f"Updating schema: {schema_id}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         print_info(f"Response status code: {response.status_code}")
 
         # Prepare logging
@@ -64,7 +38,7 @@ def update_product_schema(app_key, app_secret, access_token, schema_id, schema_d
             "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Request URL": ALIBABA_SERVER_CALL_ENTRY,
             "Request Method": "POST",
-            "Request Headers": headers,
+            "Request Headers": GOP_HEADERS,
             "Request Parameters": {
                 key: value for key, value in params.items() 
                 if key not in ['app_key', 'access_token', 'sign']
@@ -130,8 +104,13 @@ def main():
     parser = argparse.ArgumentParser(description='Update an existing product schema')
     parser.add_argument('--schema_id', type=str, required=True, help='Schema ID to update')
     parser.add_argument('--schema_file', type=str, required=True, help='Path to JSON file containing updated schema data')
+    parser.add_argument('--cat_id', type=str, help='Optional: Category ID whose stored schema the data is validated against')
+    parser.add_argument('--skip-validation', action='store_true', help='Submit without checking the data against the locally stored category schema')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     # Retrieve and validate environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -140,7 +119,7 @@ def main():
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("\nMissing required environment variables. Please check your .env file.")
         print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
-        return
+        return 1
 
     # Load schema data from file
     try:
@@ -148,14 +127,15 @@ def main():
             schema_data = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print_error(f"\nError loading schema file: {e}")
-        return
+        return 1
 
     print_header("\n=== Updating Product Schema ===")
     print_info(f"Schema ID: {args.schema_id}")
     print_info(f"Schema File: {args.schema_file}")
 
     # Make the API call
-    update_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.schema_id, schema_data)
+    if update_product_schema(APP_KEY, APP_SECRET, ACCESS_TOKEN, args.schema_id, schema_data, args.cat_id, validate=not args.skip_validation) is None:
+        return 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,64 +1,36 @@
 import os
-import requests
-import hashlib
-import hmac
-import time
-from dotenv import load_dotenv
+import sys
 import json
 from datetime import datetime
 import argparse
 from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
-
-# Load environment variables from .env file
-load_dotenv()
-
-def generate_signature(params, secret_key, api_operation):
-    sorted_params = sorted(params.items())
-    concatenated_string = api_operation
-    for k, v in sorted_params:
-        concatenated_string += f"{k}{v}"
-    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
-    return hashed
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GOP_HEADERS, get_client, is_success
+from utils.env import load_env
 
 def main():
+    import requests
     parser = argparse.ArgumentParser(description='Update product display status (on/off sale)')
     parser.add_argument('--product_id', type=str, required=True, help='ID of the product to update')
     parser.add_argument('--status', type=str, required=True, choices=['online', 'offline'], 
                       help='Display status: online (for sale) or offline (not for sale)')
     args = parser.parse_args()
 
+    # Load environment variables from .env file
+    load_env()
+
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
     ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
-    ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
-    API_OPERATION = "/icbu/product/update/display"
 
-    # Create request object
-    request_obj = {
-        "productId": args.product_id,
-        "display": args.status == "online"  # Convert to boolean: True for online, False for offline
-    }
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("\nMissing required environment variables. Please check your .env file.")
+        print_info("Required variables: APP_KEY, APP_SECRET, ACCESS_TOKEN")
+        return 1
+    client = get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN)
 
-    # Prepare API parameters
-    timestamp = str(int(time.time() * 1000))
-    params = {
-        "app_key": APP_KEY,
-        "format": "json",
-        "method": API_OPERATION,
-        "access_token": ACCESS_TOKEN,
-        "sign_method": "sha256",
-        "timestamp": timestamp,
-        "request": json.dumps(request_obj)
-    }
-
-    # Generate signature
-    signature = generate_signature(params, APP_SECRET, API_OPERATION)
-    params['sign'] = signature
-
-    headers = {
-        'X-Protocol': 'GOP',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
+    # Build and sign the request from the endpoint registry
+    params = client.prepare("product.display.update", product_id=args.product_id,
+                            display=args.status == "online")  # True for online, False for offline
 
     # Prepare logging
     log_dir = 'api_logs'
@@ -70,7 +42,7 @@ def main():
         "Request Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "Request URL": ALIBABA_SERVER_CALL_ENTRY,
         "Request Method": "POST",
-        "Request Headers": headers,
+        "Request Headers": GOP_HEADERS,
         "Request Parameters": {
             key: value for key, value in params.items() 
             if key not in ['app_key', 'access_token', 'sign']
@@ -81,7 +53,7 @@ def main():
         print_info("\nSending request to Alibaba API...")
         print_info(f"Updating product {args.product_id} display status to: {args.status}")
 
-        response = requests.post(ALIBABA_SERVER_CALL_ENTRY, data=params, headers=headers)
+        response = client.post(params)
         response_data = response.json()
 
         # Display summary of the response
@@ -120,9 +92,13 @@ def main():
             json.dump(log_data, log_file, indent=4)
         
         print_success(f"\nRequest and Response logged to {log_file_path}")
+        status = 0 if is_success(response) and response_data.get('success', False) else 1
 
     except requests.exceptions.RequestException as e:
         print_error(f"\nRequest error: {e}")
+        status = 1
+
+    return status
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,24 +1,33 @@
 import json
 import os
+import sys
 import csv
 import argparse
 from datetime import datetime
 
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.product_stream import read_products
+
 def parse_product_info(json_file_path):
     """
-    Parse product IDs and display values from a JSON file.
+    Parse product IDs and display values from a JSON or JSON Lines file.
     
     Args:
-        json_file_path (str): Path to the JSON file containing product information
+        json_file_path (str): Path to the JSON (.json) or JSON Lines (.jsonl) file containing product information
         
     Returns:
         list: List of tuples containing (product_id, display_value)
     """
     try:
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-            
-        products = data.get('products', [])
+        if json_file_path.endswith('.jsonl'):
+            products = read_products(json_file_path)
+        else:
+            with open(json_file_path, 'r') as file:
+                data = json.load(file)
+            products = data.get('products', [])
+
         product_info = []
         
         for product in products:
@@ -55,7 +64,7 @@ def save_to_csv(product_info, output_dir='api_logs'):
 
 def get_latest_json_file(api_logs_dir):
     """
-    Get the path to the most recent all_products JSON file.
+    Get the path to the most recent all_products JSON or JSON Lines file.
     
     Args:
         api_logs_dir (str): Directory containing the JSON files
@@ -63,7 +72,7 @@ def get_latest_json_file(api_logs_dir):
     Returns:
         str: Path to the latest JSON file or None if no files found
     """
-    json_files = [f for f in os.listdir(api_logs_dir) if f.startswith('all_products_') and f.endswith('.json')]
+    json_files = [f for f in os.listdir(api_logs_dir) if f.startswith('all_products_') and f.endswith(('.json', '.jsonl'))]
     if not json_files:
         return None
     latest_file = max(json_files)
@@ -1,16 +1,160 @@
 import os
 import sys
 import csv
-import time
+import codecs
+import glob
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add parent directory to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from product_get import fetch_product_details
+from utils.gop_client import get_client
 from utils.terminal_colors import print_success, print_error, print_info, print_header
+from utils.env import load_env
 
-def process_products_from_csv(csv_file_path):
+def retry_note(client):
+    """Describe how often this thread's last request was retried, for per-product messages"""
+    retries = client.last_retries()
+    return f" (after {retries} {'retry' if retries == 1 else 'retries'})" if retries else ""
+
+def enrich_row(row, app_key, app_secret, access_token):
+    """Fetch details for one input row and fill in redModel and 4SGM_SKU; returns True on success"""
+    product_id = row['Product ID']
+    row['redModel'] = ''
+    row['4SGM_SKU'] = ''
+    client = get_client(app_key, app_secret, access_token)
+    try:
+        # Fetch product details
+        response_data = fetch_product_details(product_id, app_key, app_secret, access_token)
+        retried = retry_note(client)
+
+        if not response_data or not isinstance(response_data, dict):
+            print_error(f"Failed to process product {product_id}: Invalid response format{retried}")
+            return False
+
+        product = None
+        # Handle both direct product response and nested response
+        if 'product' in response_data:
+            product = response_data['product']
+        elif 'response' in response_data and 'product' in response_data['response']:
+            product = response_data['response']['product']
+
+        if not product:
+            print_error(f"Failed to process product {product_id}: No product data found{retried}")
+            return False
+
+        red_model = product.get('redModel', '')
+
+        # Find 4SGM_SKU in attributes
+        sgm_sku = ''
+        if 'attributes' in product:
+            for attr in product['attributes']:
+                if attr.get('attributeName') == '4SGM_SKU':
+                    sgm_sku = attr.get('valueName', '')
+                    break
+
+        # Update row with new data
+        row['redModel'] = red_model
+        row['4SGM_SKU'] = sgm_sku
+
+        print_success(f"Successfully processed product {product_id}{retried}")
+        print_info(f"redModel: {red_model}")
+        print_info(f"4SGM_SKU: {sgm_sku}")
+        return True
+
+    except Exception as e:
+        print_error(f"Error processing product {product_id}: {str(e)}{retry_note(client)}")
+        return False
+
+def enrich_rows(rows, app_key, app_secret, access_token, workers=1):
+    """
+    Enrich rows and yield (row, success) in input order.
+
+    With more than one worker, rows are fetched on a thread pool (requests
+    still go through the shared rate limiter). At most workers * 2 rows are
+    in flight, so memory stays bounded on large inputs.
+    """
+    if workers <= 1:
+        for row in rows:
+            yield row, enrich_row(row, app_key, app_secret, access_token)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for row in rows:
+            pending.append((row, executor.submit(enrich_row, row, app_key, app_secret, access_token)))
+            if len(pending) >= workers * 2:
+                done_row, future = pending.popleft()
+                yield done_row, future.result()
+        while pending:
+            done_row, future = pending.popleft()
+            yield done_row, future.result()
+
+# Input encoding unless --encoding says otherwise; a UTF-8 byte order mark is skipped
+DEFAULT_INPUT_ENCODING = 'utf-8-sig'
+
+class ByteCountingLines:
+    """Iterate a binary stream as text lines while counting the bytes consumed, for progress estimates"""
+
+    def __init__(self, stream, encoding=DEFAULT_INPUT_ENCODING):
+        self.stream = stream
+        self.encoding = encoding
+        self.bytes_read = 0
+
+    def __iter__(self):
+        # One incremental decoder for the whole stream, so a BOM is only handled at the start
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        for line in self.stream:
+            self.bytes_read += len(line)
+            yield decoder.decode(line)
+
+def open_input(csv_file_path):
+    """Open the input CSV (or stdin for "-") in binary mode and return (stream, size in bytes or None)"""
+    if csv_file_path == '-':
+        return sys.stdin.buffer, None
+    stream = open(csv_file_path, 'rb')
+    return stream, os.fstat(stream.fileno()).st_size
+
+def progress_index_path(output_csv_path):
+    """Sidecar listing the product IDs already enriched successfully, one per line"""
+    return f"{output_csv_path}.done"
+
+def find_partial_output(output_dir, filename):
+    """Return the newest output for this input that still has a progress index, or None"""
+    candidates = sorted(glob.glob(os.path.join(output_dir, f"{filename}_with_details_*.csv")))
+    for path in reversed(candidates):
+        if os.path.exists(progress_index_path(path)):
+            return path
+    return None
+
+def load_done_ids(output_csv_path):
+    """Read the set of product IDs recorded in the progress index"""
+    with open(progress_index_path(output_csv_path), 'r', encoding='utf-8') as f:
+        return {line.strip() for line in f if line.strip()}
+
+def compact_partial_output(output_csv_path, done_ids):
+    """
+    Keep only rows that were enriched successfully, dropping failed rows and
+    any half-written trailing line, so those products can be appended again.
+    """
+    tmp_path = f"{output_csv_path}.tmp"
+    kept = set()
+    with open(output_csv_path, 'r', newline='') as infile, open(tmp_path, 'w', newline='') as outfile:
+        reader = csv.DictReader(infile)
+        writer = csv.DictWriter(outfile, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        for row in reader:
+            product_id = row.get('Product ID')
+            if product_id in done_ids and product_id not in kept:
+                kept.add(product_id)
+                writer.writerow(row)
+    os.replace(tmp_path, output_csv_path)
+
+def process_products_from_csv(csv_file_path, workers=1, resume=False, encoding=DEFAULT_INPUT_ENCODING):
+    """Enrich every product in the CSV; returns a summary dict, or None if the run could not start or finish"""
     # Read environment variables
     APP_KEY = os.getenv('APP_KEY')
     APP_SECRET = os.getenv('APP_SECRET')
@@ -18,109 +162,124 @@ def process_products_from_csv(csv_file_path):
 
     if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
         print_error("Missing required environment variables")
-        return
+        return None
 
     # Create output CSV path with timestamp
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     output_dir = "api_logs"
     os.makedirs(output_dir, exist_ok=True)
-    filename = os.path.splitext(os.path.basename(csv_file_path))[0]
+    filename = "stdin" if csv_file_path == '-' else os.path.splitext(os.path.basename(csv_file_path))[0]
     output_csv_path = os.path.join(output_dir, f"{filename}_with_details_{timestamp}.csv")
 
+    # Products already enriched by an interrupted run are skipped and the
+    # remaining rows are appended to that run's output
+    done_ids = set()
+    partial_output = find_partial_output(output_dir, filename) if resume else None
+    if partial_output:
+        output_csv_path = partial_output
+        done_ids = load_done_ids(output_csv_path)
+        compact_partial_output(output_csv_path, done_ids)
+        print_info(f"Resuming {output_csv_path}: {len(done_ids)} products already done")
+    elif resume:
+        print_info("No partial output found, starting a new run")
+
     # Keep track of processing stats
     total_processed = 0
     successful = 0
     failed = 0
-    
-    # Read input CSV and create output CSV
-    with open(csv_file_path, 'r') as infile, open(output_csv_path, 'w', newline='') as outfile:
-        reader = csv.DictReader(infile)
-        fieldnames = reader.fieldnames + ['redModel', '4SGM_SKU']
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        total_rows = sum(1 for row in infile) - 1  # Subtract header row
-        infile.seek(0)
-        next(reader)  # Skip header row again
-        
-        print_header(f"\n=== Processing {total_rows} products ===")
-        
-        for i, row in enumerate(reader, 1):
-            product_id = row['Product ID']
-            print_info(f"\nProcessing product {i}/{total_rows}: {product_id}")
-            
-            try:
-                # Fetch product details
-                response_data = fetch_product_details(product_id, APP_KEY, APP_SECRET, ACCESS_TOKEN)
-                
-                if response_data and isinstance(response_data, dict):
-                    product = None
-                    # Handle both direct product response and nested response
-                    if 'product' in response_data:
-                        product = response_data['product']
-                    elif 'response' in response_data and 'product' in response_data['response']:
-                        product = response_data['response']['product']
-                    
-                    if product:
-                        red_model = product.get('redModel', '')
-                        
-                        # Find 4SGM_SKU in attributes
-                        sgm_sku = ''
-                        if 'attributes' in product:
-                            for attr in product['attributes']:
-                                if attr.get('attributeName') == '4SGM_SKU':
-                                    sgm_sku = attr.get('valueName', '')
-                                    break
-                        
-                        # Update row with new data
-                        row['redModel'] = red_model
-                        row['4SGM_SKU'] = sgm_sku
-                        
-                        successful += 1
-                        print_success(f"Successfully processed product {product_id}")
-                        print_info(f"redModel: {red_model}")
-                        print_info(f"4SGM_SKU: {sgm_sku}")
-                    else:
-                        row['redModel'] = ''
-                        row['4SGM_SKU'] = ''
-                        failed += 1
-                        print_error(f"Failed to process product {product_id}: No product data found")
+    skipped = 0
+
+    # Stream the input in a single pass; progress is estimated from bytes read
+    # instead of counting rows up front, so huge files and pipes start at once
+    infile, total_bytes = open_input(csv_file_path)
+    lines = ByteCountingLines(infile, encoding)
+    try:
+        mode = 'a' if partial_output else 'w'
+        with open(output_csv_path, mode, newline='') as outfile, \
+                open(progress_index_path(output_csv_path), mode, encoding='utf-8') as done_file:
+            reader = csv.DictReader(lines)
+            fieldnames = (reader.fieldnames or []) + ['redModel', '4SGM_SKU']
+            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+            if not partial_output:
+                writer.writeheader()
+
+            print_header(f"\n=== Processing products from {csv_file_path} with {workers} worker(s) ===")
+
+            def pending_rows():
+                nonlocal skipped
+                for row in reader:
+                    if row['Product ID'] in done_ids:
+                        skipped += 1
+                        continue
+                    yield row
+
+            for i, (row, success) in enumerate(enrich_rows(pending_rows(), APP_KEY, APP_SECRET, ACCESS_TOKEN, workers), 1):
+                # Write rows in input order as soon as they are done; the ID is
+                # only marked done once its row is safely on disk
+                writer.writerow(row)
+                outfile.flush()
+                if success:
+                    successful += 1
+                    done_file.write(f"{row['Product ID']}\n")
+                    done_file.flush()
                 else:
-                    row['redModel'] = ''
-                    row['4SGM_SKU'] = ''
                     failed += 1
-                    print_error(f"Failed to process product {product_id}: Invalid response format")
-                
-            except Exception as e:
-                row['redModel'] = ''
-                row['4SGM_SKU'] = ''
-                failed += 1
-                print_error(f"Error processing product {product_id}: {str(e)}")
-            
-            # Write the row immediately after processing
-            writer.writerow(row)
-            total_processed += 1
-            
-            # Sleep for 1 seconds between requests (unless it's the last item)
-            if i < total_rows:
-                print_info("Waiting 1 seconds before next request...")
-                time.sleep(1)
-    
+                total_processed += 1
+                if total_bytes:
+                    progress = min(100.0, lines.bytes_read / total_bytes * 100)
+                    print_info(f"Processed product {i}: {row['Product ID']} (~{progress:.1f}% of input read)")
+                else:
+                    print_info(f"Processed product {i}: {row['Product ID']} ({lines.bytes_read} bytes read)")
+    except UnicodeDecodeError as e:
+        # Rows written so far stay recorded, so --resume picks up from here
+        print_error(f"\nInput is not valid {encoding} near byte {lines.bytes_read}: {e}")
+        print_info("Run again with --encoding set to the file's encoding (e.g. cp1252) and --resume")
+        return None
+    finally:
+        if infile is not sys.stdin.buffer:
+            infile.close()
+
+    # A finished run needs no progress index; failed rows keep it so that
+    # --resume can retry just those products
+    if not failed:
+        os.remove(progress_index_path(output_csv_path))
+
     print_success(f"\nProcessing complete!")
     print_info(f"Total processed: {total_processed}")
+    if skipped:
+        print_info(f"Skipped (already done): {skipped}")
     print_success(f"Successful: {successful}")
     print_error(f"Failed: {failed}")
+    if failed:
+        print_info("Run again with --resume to retry only the failed products")
+    print_info(f"Retried requests: {get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN).stats['retries']}")
     print_info(f"Results saved to {output_csv_path}")
-    
-    return output_csv_path
+
+    return {"output": output_csv_path, "processed": total_processed, "successful": successful,
+            "failed": failed, "skipped": skipped}
 
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Process products from CSV file and extract redModel and 4SGM_SKU')
-    parser.add_argument('csv_file', help='Path to the CSV file containing product IDs')
+    parser.add_argument('csv_file', help='Path to the CSV file containing product IDs, or - to read from stdin')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of products fetched in parallel, within the shared rate limit (default: 1)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the newest unfinished output for this input, skipping products already enriched')
+    parser.add_argument('--encoding', type=str, default=DEFAULT_INPUT_ENCODING,
+                        help=f'Text encoding of the input CSV, e.g. cp1252 for some Excel exports (default: {DEFAULT_INPUT_ENCODING})')
     args = parser.parse_args()
-    
-    process_products_from_csv(args.csv_file)
+    try:
+        codecs.lookup(args.encoding)
+    except LookupError:
+        parser.error(f"unknown encoding: {args.encoding}")
+
+    # Load environment variables from .env file
+    load_env()
+
+    summary = process_products_from_csv(args.csv_file, workers=args.workers, resume=args.resume, encoding=args.encoding)
+    if summary is None or summary['failed']:
+        return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from product_list_all import LIST_ENDPOINT, fetch_products
+from utils.gop_client import get_client
+from utils.product_stream import ProductStreamWriter, read_header, read_products
+from utils.crawl_checkpoint import load_checkpoint, save_checkpoint
+from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+from utils.env import load_env
+
+STATE_FILE = os.path.join('api_logs', 'product_sync_state.json')
+SNAPSHOT_FILE = os.path.join('api_logs', 'products_snapshot.jsonl')
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+PAGE_SIZE = 30
+
+def fetch_modified_products(client, gmt_modified_from=None, gmt_modified_to=None, page_size=PAGE_SIZE):
+    """
+    Fetch every on-sale product modified inside the given window.
+
+    Args:
+        client (GopClient): Client used to sign and send requests
+        gmt_modified_from (str, optional): Lower bound; omitted for a full sync
+        gmt_modified_to (str, optional): Upper bound
+        page_size (int): Products per page
+
+    Returns:
+        list: Modified products, or None if any page failed
+    """
+    products = []
+    current_page = 1
+    while True:
+        params = LIST_ENDPOINT.build(
+            current_page=current_page,
+            page_size=page_size,
+            schema_custom_fields="model,4sgm_SKU",
+            gmt_modified_from=gmt_modified_from or None,
+            gmt_modified_to=gmt_modified_to or None
+        )
+
+        print_info(f"Fetching page {current_page}...")
+        response_data = fetch_products(client, params)
+        if not response_data or 'result' not in response_data:
+            print_error(f"Failed to fetch page {current_page}")
+            return None
+
+        page_products = response_data['result'].get('products', [])
+        products.extend(page_products)
+        total_count = response_data['result'].get('total_item', 0)
+        if len(products) >= total_count or len(page_products) < page_size:
+            return products
+        current_page += 1
+
+def product_sort_key(product):
+    """Sort key for the snapshot: numeric ids in numeric order, anything else after them"""
+    product_id = product.get('id')
+    if isinstance(product_id, int) or (isinstance(product_id, str) and product_id.isdigit()):
+        return (0, int(product_id), '')
+    return (1, 0, str(product_id))
+
+def read_snapshot(snapshot_path):
+    """
+    Yield the snapshot's products in id order.
+
+    Snapshots written before the merge became a streaming one are not sorted;
+    those are sorted in memory once, and the next merge stores them sorted.
+    """
+    if not os.path.exists(snapshot_path):
+        return
+    header = read_header(snapshot_path) or {}
+    if header.get('metadata', {}).get('sorted_by') == 'id':
+        yield from read_products(snapshot_path)
+    else:
+        print_warning(f"{snapshot_path} is not sorted by id yet; sorting it once in memory")
+        yield from sorted(read_products(snapshot_path), key=product_sort_key)
+
+def merge_into_snapshot(snapshot_path, changed_products, watermark, reconcile=False):
+    """
+    Merge changed products into the snapshot by product id.
+
+    The snapshot is kept sorted by id, so the sorted changes are merged
+    against it in a single streaming pass; only the changes are held in
+    memory. With reconcile, changed_products is a full listing and snapshot
+    products missing from it (deleted or taken off sale) are dropped.
+
+    The merged snapshot is written to a temporary file and renamed over the
+    old one, so readers never see a half-written snapshot.
+
+    Returns:
+        dict: Counts of products updated, added and removed, and the new total
+    """
+    changes = sorted({product_sort_key(product): product for product in changed_products}.items(),
+                     key=lambda item: item[0])
+    counts = {"updated": 0, "added": 0, "removed": 0}
+
+    def merged_products():
+        position = 0
+        for product in read_snapshot(snapshot_path):
+            key = product_sort_key(product)
+            while position < len(changes) and changes[position][0] < key:
+                counts["added"] += 1
+                yield changes[position][1]
+                position += 1
+            if position < len(changes) and changes[position][0] == key:
+                counts["updated"] += 1
+                yield changes[position][1]
+                position += 1
+            elif reconcile:
+                counts["removed"] += 1
+            else:
+                yield product
+        for _, product in changes[position:]:
+            counts["added"] += 1
+            yield product
+
+    tmp_path = f"{snapshot_path}.tmp"
+    writer = ProductStreamWriter(tmp_path, dedup_key=None, metadata={"watermark": watermark, "sorted_by": "id"})
+    writer.write_products(merged_products())
+    writer.close(watermark=watermark)
+    os.replace(tmp_path, snapshot_path)
+    counts["total"] = writer.count
+    return counts
+
+def sync_products(client, state_path=STATE_FILE, snapshot_path=SNAPSHOT_FILE, since=None, overlap_minutes=5,
+                  full_reconcile=False):
+    """
+    Fetch products modified since the stored watermark and merge them into the snapshot.
+
+    The watermark only advances after the snapshot has been replaced, so an
+    interrupted sync simply repeats the same window on the next run.
+
+    An incremental sync cannot see products that were deleted or taken off
+    sale, since they no longer appear in the listing. full_reconcile fetches
+    the full listing instead and drops snapshot products missing from it.
+
+    Returns:
+        dict: Sync summary, or None if the sync failed
+    """
+    state = load_checkpoint(state_path) or {}
+    watermark = since or state.get('watermark')
+    sync_started = datetime.now()
+
+    gmt_modified_from = None
+    if full_reconcile:
+        print_info("Fetching the full listing to reconcile the snapshot")
+    elif watermark:
+        # Re-read a small overlap to tolerate clock skew; the merge is idempotent
+        window_start = datetime.strptime(watermark, TIME_FORMAT) - timedelta(minutes=overlap_minutes)
+        gmt_modified_from = window_start.strftime(TIME_FORMAT)
+        print_info(f"Fetching products modified since {gmt_modified_from}")
+    else:
+        print_warning("No watermark found, performing a full sync")
+    gmt_modified_to = sync_started.strftime(TIME_FORMAT)
+
+    changed_products = fetch_modified_products(client, gmt_modified_from, gmt_modified_to)
+    if changed_products is None:
+        return None
+
+    counts = merge_into_snapshot(snapshot_path, changed_products, gmt_modified_to, reconcile=full_reconcile)
+    state.update({
+        "watermark": gmt_modified_to,
+        "snapshot_file": snapshot_path,
+        "last_sync": sync_started.strftime(TIME_FORMAT),
+        "last_changed": len(changed_products),
+        "total_products": counts["total"]
+    })
+    if full_reconcile:
+        state["last_full_reconcile"] = sync_started.strftime(TIME_FORMAT)
+    save_checkpoint(state_path, state)
+    return dict(counts, changed=len(changed_products), watermark=gmt_modified_to)
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally sync on-sale products modified since the last run')
+    parser.add_argument('--state', type=str, default=STATE_FILE, help=f'Watermark state file (default: {STATE_FILE})')
+    parser.add_argument('--snapshot', type=str, default=SNAPSHOT_FILE, help=f'Local product snapshot (default: {SNAPSHOT_FILE})')
+    parser.add_argument('--since', type=str, help=f'Override the stored watermark (format: {TIME_FORMAT.replace("%", "")})')
+    parser.add_argument('--overlap_minutes', type=int, default=5, help='Minutes re-read before the watermark (default: 5)')
+    parser.add_argument('--full_reconcile', action='store_true',
+                        help='Fetch the full listing and drop snapshot products that are deleted or no longer on sale')
+    args = parser.parse_args()
+
+    # Load environment variables from .env file
+    load_env()
+
+    APP_KEY = os.getenv('APP_KEY')
+    APP_SECRET = os.getenv('APP_SECRET')
+    ACCESS_TOKEN = os.getenv('ACCESS_TOKEN')
+
+    if not all([APP_KEY, APP_SECRET, ACCESS_TOKEN]):
+        print_error("Missing required environment variables")
+        return 1
+
+    os.makedirs(os.path.dirname(args.state) or '.', exist_ok=True)
+    os.makedirs(os.path.dirname(args.snapshot) or '.', exist_ok=True)
+
+    print_header("\n=== Syncing Modified Products ===")
+    summary = sync_products(get_client(APP_KEY, APP_SECRET, ACCESS_TOKEN), args.state, args.snapshot,
+                            since=args.since, overlap_minutes=args.overlap_minutes, full_reconcile=args.full_reconcile)
+    if summary is None:
+        print_error("\nSync failed; watermark not advanced")
+        return 1
+
+    print_success("\nSync complete!")
+    print_info(f"Changed products: {summary['changed']} ({summary['updated']} updated, {summary['added']} new)")
+    if args.full_reconcile:
+        print_info(f"Removed products: {summary['removed']} (deleted or no longer on sale)")
+    else:
+        print_warning("Incremental syncs do not detect deleted or off-sale products; run with --full_reconcile periodically")
+    print_info(f"Snapshot now holds {summary['total']} products: {args.snapshot}")
+    print_info(f"Watermark advanced to {summary['watermark']}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import os
+import sys
+import csv
+import argparse
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.schema_store import SchemaStore
+from utils.schema_validator import iter_fields
+from utils.terminal_colors import print_success, print_error, print_info, print_header
+
+OUTPUT_FILE = os.path.join('api_logs', 'schema_fields.csv')
+
+def walk_fields(specs, parent_id=''):
+    """Yield (field id, spec) for specs and their nested fields, depth first"""
+    for spec in specs:
+        field_id = f"{parent_id}.{spec.id}" if parent_id else spec.id
+        yield field_id, spec
+        yield from walk_fields(spec.children, field_id)
+
+def export_field_index(store, output_path):
+    """
+    Write one CSV row per field of every stored schema.
+
+    Each schema file is streamed with iter_fields, so only one top-level
+    field is held in memory at a time regardless of schema size.
+
+    Returns:
+        tuple: (schemas processed, rows written)
+    """
+    schemas = rows = 0
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['cat_id', 'schema_id', 'field_id', 'name', 'type', 'required', 'options'])
+        for cat_id, schema_id, content_hash in store.categories():
+            for field_id, spec in walk_fields(iter_fields(store.object_path(content_hash))):
+                writer.writerow([cat_id, schema_id, field_id, spec.name, spec.type, spec.required, len(spec.options)])
+                rows += 1
+            schemas += 1
+    return schemas, rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a field index for every locally stored category schema')
+    parser.add_argument('--output', type=str, default=OUTPUT_FILE, help=f'CSV file to write (default: {OUTPUT_FILE})')
+    args = parser.parse_args()
+
+    store = SchemaStore()
+    if not store.categories():
+        print_error("No schemas stored yet; fetch them with product_schema_get.py first")
+        return 1
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    print_header("\n=== Exporting Schema Field Index ===")
+    schemas, rows = export_field_index(store, args.output)
+    store.close()
+    print_success(f"\nIndexed {rows} fields from {schemas} schemas")
+    print_info(f"Field index saved to {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import argparse
+
+# Add parent directory to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.schema_validator import load_validator
+from utils.terminal_colors import print_success, print_error, print_info, print_warning, print_header
+
+def read_payloads(path):
+    """
+    Read schema_data payloads from a JSON file (one object or a list) or a JSONL file.
+
+    Returns:
+        list: Payload dicts in file order
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, list) else [data]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate schema data payloads against a locally stored category schema')
+    parser.add_argument('--cat_id', type=str, required=True, help='Category ID whose stored schema is used')
+    parser.add_argument('--schema_id', type=str, help='Schema ID stored with product_schema_get.py --schema_id (default: the latest stored schema)')
+    parser.add_argument('files', nargs='+', help='JSON files (one payload or a list) or JSONL files of payloads')
+    args = parser.parse_args()
+
+    validator = load_validator(args.cat_id, schema_id=args.schema_id)
+    if validator is None:
+        print_error(f"No local schema for category {args.cat_id}; run product_schema_get.py --cat_id {args.cat_id} first")
+        sys.exit(2)
+
+    print_header("\n=== Validating Schema Data ===")
+    total = invalid = 0
+    for path in args.files:
+        try:
+            payloads = read_payloads(path)
+        except (OSError, json.JSONDecodeError) as e:
+            print_error(f"{path}: could not be read: {e}")
+            total += 1
+            invalid += 1
+            continue
+        results = validator.validate_many(payloads)
+        total += len(payloads)
+        invalid += len(results)
+        for index, errors in results.items():
+            label = path if len(payloads) == 1 else f"{path}[{index}]"
+            print_warning(f"{label}: {len(errors)} problems")
+            for error in errors:
+                print_error(f"  - {error}")
+
+    if invalid:
+        print_error(f"\n{invalid} of {total} payloads failed validation")
+        sys.exit(1)
+    print_success(f"\nAll {total} payloads passed validation")
+    print_info("They can be submitted with product_schema_add.py, product_schema_add_draft.py or product_schema_update.py")
+
+if __name__ == "__main__":
+    main()
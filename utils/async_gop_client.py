@@ -0,0 +1,160 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.endpoints import inventory_item
+from utils.gop_client import ALIBABA_SERVER_CALL_ENTRY, GopClient, create_session
+
+# Default number of GOP calls allowed in flight at once
+DEFAULT_CONCURRENCY = 50
+
+class AsyncGopClient:
+    """
+    Awaitable counterpart of GopClient for keeping many GOP calls in flight.
+
+    Requests are signed and sent on a worker thread over a pooled session sized
+    to max_concurrency; an asyncio.Semaphore bounds how many run at once. Each
+    request is signed just before it is sent so timestamps stay fresh even when
+    calls wait on the semaphore.
+
+    Example:
+        async with AsyncGopClient(APP_KEY, APP_SECRET, ACCESS_TOKEN) as client:
+            products = await client.gather(client.product_get(pid) for pid in ids)
+    """
+
+    def __init__(self, app_key, app_secret, access_token, max_concurrency=DEFAULT_CONCURRENCY,
+                 server_url=ALIBABA_SERVER_CALL_ENTRY, timeout=None):
+        self.max_concurrency = max_concurrency
+        self._client = GopClient(app_key, app_secret, access_token, server_url=server_url,
+                                 timeout=timeout, session=create_session(pool_maxsize=max_concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Release the worker threads and pooled connections"""
+        self._executor.shutdown(wait=False)
+        self._client.session.close()
+
+    async def _run(self, func, *args):
+        # Created lazily so the semaphore binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def call(self, api_operation, extra=None, path=''):
+        """
+        Sign and send a request without blocking the event loop.
+
+        Args:
+            api_operation (str): API path, e.g. "/icbu/product/get"
+            extra (dict, optional): Business parameters for the request
+            path (str, optional): Suffix appended to the server URL
+
+        Returns:
+            dict: Decoded JSON response body
+        """
+        return await self._run(self._client.call, api_operation, extra, path)
+
+    async def invoke(self, endpoint, **kwargs):
+        """
+        Call a registered endpoint (see utils.endpoints) without blocking the event loop.
+
+        Args:
+            endpoint (str): Registry name or API path, e.g. "product.get"
+            **kwargs: Arguments declared by the endpoint's fields
+
+        Returns:
+            dict: Decoded JSON response body
+        """
+        return await self._run(functools.partial(self._client.invoke, endpoint, **kwargs))
+
+    async def gather(self, coros, return_exceptions=True):
+        """Run coroutines concurrently and return their results in input order"""
+        return await asyncio.gather(*coros, return_exceptions=return_exceptions)
+
+    # Product endpoints
+
+    async def product_get(self, product_id, website=None):
+        return await self.invoke("product.get", product_id=product_id, website=website)
+
+    async def product_list(self, current_page=1, page_size=20, filter_type="onSelling", **filters):
+        return await self.invoke("product.list", current_page=current_page, page_size=page_size,
+                                 filter_type=filter_type, **filters)
+
+    async def product_available_get(self, product_id):
+        return await self.invoke("product.available.get", product_id=product_id)
+
+    async def product_score_get(self, product_id):
+        return await self.invoke("product.score.get", product_id=product_id)
+
+    async def product_id_encrypt(self, product_id, convert_type):
+        return await self.invoke("product.id.encrypt", product_id=product_id, convert_type=convert_type)
+
+    async def product_group_add(self, product_id, group_id):
+        return await self.invoke("product.group.add", product_ids=[product_id], group_id=group_id)
+
+    async def product_update_display(self, product_id, display):
+        return await self.invoke("product.display.update", product_id=product_id, display=display)
+
+    # Inventory endpoints
+
+    async def product_inventory_get(self, product_id):
+        return await self.invoke("inventory.get", product_id=product_id)
+
+    async def product_inventory_update(self, product_id, sku_id, quantity, multiple=False):
+        return await self.invoke("inventory.update", items=[inventory_item(product_id, sku_id, quantity, multiple)])
+
+    # Category endpoints
+
+    async def category_get(self, cat_id):
+        return await self.invoke("category.get", cat_id=cat_id)
+
+    async def category_id_mapping(self, convert_type=None, cat_id=None, attribute_id=None, attribute_value_id=None):
+        return await self.invoke("category.id.mapping", convert_type=convert_type, cat_id=cat_id,
+                                 attribute_id=attribute_id, attribute_value_id=attribute_value_id)
+
+    # Schema endpoints
+
+    async def schema_get(self, cat_id, schema_id=None):
+        return await self.invoke("schema.get", cat_id=cat_id, schema_id=schema_id or None)
+
+    async def schema_render(self, schema_id, language=None):
+        return await self.invoke("schema.render", schema_id=schema_id, language=language or None)
+
+    async def schema_render_draft(self, draft_id, language=None):
+        return await self.invoke("schema.render.draft", draft_id=draft_id, language=language or None)
+
+    async def schema_add(self, cat_id, schema_data):
+        return await self.invoke("schema.add", cat_id=cat_id, schema_data=schema_data)
+
+    async def schema_add_draft(self, cat_id, schema_data):
+        return await self.invoke("schema.add.draft", cat_id=cat_id, schema_data=schema_data)
+
+    async def schema_update(self, schema_id, schema_data):
+        return await self.invoke("schema.update", schema_id=schema_id, schema_data=schema_data)
+
+    async def schema_level_get(self, cat_id, language="en_US"):
+        return await self.invoke("schema.level.get", cat_id=cat_id, language=language)
+
+    # Photo bank endpoints
+
+    async def photobank_group_list(self, current_page=1, page_size=20, **filters):
+        return await self.invoke("photobank.group.list", current_page=current_page, page_size=page_size, **filters)
+
+    async def photobank_list(self, group_id, current_page=1, page_size=20, **filters):
+        return await self.invoke("photobank.list", group_id=group_id, current_page=current_page,
+                                 page_size=page_size, **filters)
+
+    async def photobank_group_operate(self, operation, group_id=None, group_name=None, description=None):
+        if operation != 'delete':
+            description = description or ""
+        return await self.invoke("photobank.group.operate", operation=operation, group_id=group_id or None,
+                                 group_name=group_name or None, description=description)
@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_MAPPING_PATH = os.path.join('api_logs', 'category_id_map.sqlite3')
+
+# convert_type values accepted by /alibaba/icbu/category/id/mapping
+CATEGORY = 1
+ATTRIBUTE = 2
+ATTRIBUTE_VALUE = 3
+
+def mapping_key(convert_type, cat_id=None, attribute_id=None, attribute_value_id=None):
+    """Normalise a mapping request into the tuple used as the table's primary key"""
+    return (int(convert_type), str(cat_id or ''), str(attribute_id or ''), str(attribute_value_id or ''))
+
+def mapping_requests(rows):
+    """
+    Expand (cat_id, attribute_id, attribute_value_id) rows into every mapping they need.
+
+    A row with only a cat_id needs a category mapping; adding an attribute_id
+    also needs the attribute mapping, and adding a value id the value mapping.
+
+    Returns:
+        list: Unique mapping keys, categories first
+    """
+    keys = set()
+    for row in rows:
+        cat_id = row.get('cat_id')
+        attribute_id = row.get('attribute_id')
+        attribute_value_id = row.get('attribute_value_id')
+        if cat_id:
+            keys.add(mapping_key(CATEGORY, cat_id))
+        if attribute_id:
+            keys.add(mapping_key(ATTRIBUTE, cat_id, attribute_id))
+        if attribute_id and attribute_value_id:
+            keys.add(mapping_key(ATTRIBUTE_VALUE, cat_id, attribute_id, attribute_value_id))
+    return sorted(keys)
+
+def parse_mapping(response_data):
+    """Return the result object of a successful mapping response, or None"""
+    if not isinstance(response_data, dict):
+        return None
+    result = response_data.get('result')
+    if isinstance(result, dict) and result.get('success'):
+        return result
+    return None
+
+class CategoryIdMappingTable:
+    """
+    Local table of category, attribute and attribute value ID mappings.
+
+    All rows are loaded into a dict on open, so lookup() never touches the
+    database or the network; store() writes new results through to SQLite.
+    """
+
+    def __init__(self, path=DEFAULT_MAPPING_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS id_mappings (
+                convert_type INTEGER NOT NULL,
+                cat_id TEXT NOT NULL,
+                attribute_id TEXT NOT NULL,
+                attribute_value_id TEXT NOT NULL,
+                result TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (convert_type, cat_id, attribute_id, attribute_value_id)
+            )
+        ''')
+        self._conn.commit()
+        self._mappings = {
+            (convert_type, cat_id, attribute_id, attribute_value_id): json.loads(result)
+            for convert_type, cat_id, attribute_id, attribute_value_id, result
+            in self._conn.execute('SELECT convert_type, cat_id, attribute_id, attribute_value_id, result FROM id_mappings')
+        }
+
+    def __len__(self):
+        return len(self._mappings)
+
+    def __contains__(self, key):
+        return key in self._mappings
+
+    def lookup(self, convert_type, cat_id=None, attribute_id=None, attribute_value_id=None):
+        """Return the stored mapping result, or None if it has not been loaded"""
+        return self._mappings.get(mapping_key(convert_type, cat_id, attribute_id, attribute_value_id))
+
+    def store(self, results):
+        """Save {mapping key: result} pairs in one transaction"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO id_mappings VALUES (?, ?, ?, ?, ?, ?)',
+            (key + (json.dumps(result, ensure_ascii=False), now) for key, result in results.items())
+        )
+        self._conn.commit()
+        self._mappings.update(results)
+
+    def close(self):
+        self._conn.close()
+
+async def preload_mappings(async_client, table, keys):
+    """
+    Fetch every mapping in keys that the table does not have yet, concurrently.
+
+    Returns:
+        tuple: (number of mappings fetched, list of keys that failed)
+    """
+    missing = [key for key in keys if key not in table]
+    responses = await async_client.gather(
+        async_client.category_id_mapping(convert_type, cat_id or None, attribute_id or None, attribute_value_id or None)
+        for convert_type, cat_id, attribute_id, attribute_value_id in missing
+    )
+    fetched = {}
+    failed = []
+    for key, response_data in zip(missing, responses):
+        result = None if isinstance(response_data, Exception) else parse_mapping(response_data)
+        if result is None:
+            failed.append(key)
+        else:
+            fetched[key] = result
+    table.store(fetched)
+    return len(fetched), failed
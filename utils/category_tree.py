@@ -0,0 +1,271 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_TREE_PATH = os.path.join('api_logs', 'category_tree.sqlite3')
+ROOT_CATEGORY_ID = 0
+
+# Extra passes over categories that failed to fetch before a crawl gives up on them
+RETRY_ROUNDS = 2
+
+def parse_category(response_data):
+    """
+    Pull the category fields out of a category/get response.
+
+    The category sits in result.result; a response without it is only
+    accepted if result.success is true, so wrapped failures are retried
+    instead of being recorded as empty leaves.
+
+    Returns:
+        dict: name, leaf flag and child ids, or None if the response is an error
+    """
+    if not isinstance(response_data, dict):
+        return None
+    result = response_data.get('result')
+    if not isinstance(result, dict) or result.get('success') is False:
+        return None
+    if isinstance(result.get('result'), dict):
+        result = result['result']
+    elif result.get('success') is not True:
+        return None
+    if not result:
+        return None
+    child_ids = [int(child_id) for child_id in result.get('child_ids') or []]
+    leaf = result.get('leaf_category')
+    return {
+        "name": result.get('name') or result.get('cn_name') or '',
+        "leaf": bool(leaf) if leaf is not None else not child_ids,
+        "children": child_ids
+    }
+
+async def fetch_level(async_client, level, retry_rounds=RETRY_ROUNDS):
+    """
+    Fetch one level of (cat_id, parent_id, depth) entries concurrently.
+
+    Entries whose response is missing or an error are fetched again, up to
+    retry_rounds more times, once the rest of the level is done.
+
+    Returns:
+        tuple: ({cat_id: parsed category}, entries that still failed)
+    """
+    fetched = {}
+    pending = level
+    for _ in range(retry_rounds + 1):
+        responses = await async_client.gather(async_client.category_get(cat_id) for cat_id, _, _ in pending)
+        failed = []
+        for entry, response_data in zip(pending, responses):
+            category = None if isinstance(response_data, Exception) else parse_category(response_data)
+            if category is None:
+                failed.append(entry)
+            else:
+                fetched[entry[0]] = category
+        pending = failed
+        if not pending:
+            break
+    return fetched, pending
+
+async def crawl_categories(async_client, root_id=ROOT_CATEGORY_ID, retry_rounds=RETRY_ROUNDS):
+    """
+    Walk the category tree breadth-first, one level at a time.
+
+    Each level is fetched concurrently through async_client, whose
+    max_concurrency bounds the requests in flight. Categories that still
+    fail after retry_rounds extra attempts are left out (and so is their
+    subtree) and reported in the failed list; callers should not store a
+    tree with failures in place of a complete one.
+
+    Returns:
+        tuple: (categories keyed by id, list of ids that could not be fetched)
+    """
+    categories = {}
+    failed = []
+    level = [(root_id, None, 0)]
+    while level:
+        fetched, level_failed = await fetch_level(async_client, level, retry_rounds)
+        failed.extend(cat_id for cat_id, _, _ in level_failed)
+        next_level = []
+        for cat_id, parent_id, depth in level:
+            category = fetched.get(cat_id)
+            if category is None:
+                continue
+            category.update({"id": cat_id, "parent_id": parent_id, "depth": depth})
+            categories[cat_id] = category
+            for child_id in category["children"]:
+                # The tree should not repeat ids, but never revisit one if it does
+                if child_id not in categories:
+                    next_level.append((child_id, cat_id, depth + 1))
+        level = next_level
+    return categories, failed
+
+class CategoryTree:
+    """
+    Read-only, in-memory view of the locally stored category tree.
+
+    Every category is loaded into a dict on open, so lookups and path
+    queries never touch the network or the database. Paths are memoized,
+    and a preorder (Euler tour) numbering gives each category an interval
+    [enter, exit) that contains exactly its descendants, so subtree
+    membership is an O(1) comparison and a subtree is a contiguous slice.
+    """
+
+    def __init__(self, categories, built_at=None):
+        self.categories = categories
+        self.built_at = built_at
+        self._paths = {}
+        self._leaves = {}
+        self._order = None
+        self._enter = None
+        self._exit = None
+
+    def __contains__(self, cat_id):
+        return int(cat_id) in self.categories
+
+    def __len__(self):
+        return len(self.categories)
+
+    def get(self, cat_id):
+        """Return the category dict (id, name, parent_id, children, leaf, depth), or None"""
+        return self.categories.get(int(cat_id))
+
+    def path(self, cat_id):
+        """Return the ids from the top-level category down to cat_id (the root 0 is omitted)"""
+        cat_id = int(cat_id)
+        # Climb until a memoized path (or the top) is reached, then fill in
+        # the paths of every category passed on the way back down
+        climbed = []
+        current = cat_id
+        while current not in self._paths:
+            category = self.categories.get(current)
+            if category is None or current == ROOT_CATEGORY_ID:
+                self._paths[current] = ()
+                break
+            climbed.append(current)
+            current = category["parent_id"]
+        path = self._paths[current]
+        for climbed_id in reversed(climbed):
+            path = path + (climbed_id,)
+            self._paths[climbed_id] = path
+        return list(self._paths[cat_id])
+
+    def path_names(self, cat_id, separator=' > '):
+        """Return the category path as a readable string"""
+        return separator.join(self.breadcrumb(cat_id))
+
+    def breadcrumb(self, cat_id):
+        """Return the category names from the top-level category down to cat_id"""
+        return [self.categories[path_id]["name"] for path_id in self.path(cat_id)]
+
+    def ancestors(self, cat_id):
+        """Return the ids above cat_id, nearest first (the root 0 is omitted)"""
+        return self.path(cat_id)[-2::-1]
+
+    def top_level(self, cat_id):
+        """Return the id of the top-level category cat_id belongs to, or None"""
+        path = self.path(cat_id)
+        return path[0] if path else None
+
+    def _index(self):
+        """Number every category in preorder; each subtree becomes one contiguous range"""
+        if self._order is not None:
+            return
+        order, enter, exit_ = [], {}, {}
+        roots = [cat_id for cat_id, category in self.categories.items()
+                 if category["parent_id"] not in self.categories]
+        for root in sorted(roots):
+            # Iterative DFS so deep trees cannot hit the recursion limit
+            stack = [(root, False)]
+            while stack:
+                cat_id, done = stack.pop()
+                if done:
+                    exit_[cat_id] = len(order)
+                    continue
+                if cat_id in enter:
+                    continue
+                enter[cat_id] = len(order)
+                order.append(cat_id)
+                stack.append((cat_id, True))
+                children = [child_id for child_id in self.categories[cat_id]["children"] if child_id in self.categories]
+                stack.extend((child_id, False) for child_id in reversed(children))
+        self._order, self._enter, self._exit = order, enter, exit_
+
+    def interval(self, cat_id):
+        """Return the preorder interval (enter, exit) of cat_id's subtree"""
+        self._index()
+        cat_id = int(cat_id)
+        return self._enter[cat_id], self._exit[cat_id]
+
+    def is_descendant(self, cat_id, ancestor_id):
+        """Return True if cat_id is ancestor_id or lies anywhere below it, in O(1)"""
+        self._index()
+        cat_id, ancestor_id = int(cat_id), int(ancestor_id)
+        if cat_id not in self._enter or ancestor_id not in self._enter:
+            return False
+        return self._enter[ancestor_id] <= self._enter[cat_id] < self._exit[ancestor_id]
+
+    def descendants(self, cat_id):
+        """Return every id below cat_id, in preorder"""
+        enter, exit_ = self.interval(cat_id)
+        return self._order[enter + 1:exit_]
+
+    def leaves(self, cat_id):
+        """Return the leaf categories in cat_id's subtree (cat_id itself if it is a leaf)"""
+        cat_id = int(cat_id)
+        cached = self._leaves.get(cat_id)
+        if cached is None:
+            enter, exit_ = self.interval(cat_id)
+            cached = tuple(leaf_id for leaf_id in self._order[enter:exit_] if self.categories[leaf_id]["leaf"])
+            self._leaves[cat_id] = cached
+        return list(cached)
+
+def save_category_tree(categories, path=DEFAULT_TREE_PATH):
+    """Write the categories to a fresh SQLite store, replacing any previous one atomically"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute('''
+            CREATE TABLE categories (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                parent_id INTEGER,
+                children TEXT NOT NULL,
+                leaf INTEGER NOT NULL,
+                depth INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX idx_categories_parent ON categories (parent_id)')
+        conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.executemany(
+            'INSERT INTO categories VALUES (?, ?, ?, ?, ?, ?)',
+            ((c["id"], c["name"], c["parent_id"], json.dumps(c["children"]), int(c["leaf"]), c["depth"])
+             for c in categories.values())
+        )
+        conn.execute('INSERT INTO meta VALUES (?, ?)', ("built_at", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+
+def load_category_tree(path=DEFAULT_TREE_PATH):
+    """Load the stored tree into memory, or return None if it has not been built"""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path)
+    try:
+        categories = {}
+        for cat_id, name, parent_id, children, leaf, depth in conn.execute('SELECT * FROM categories'):
+            categories[cat_id] = {
+                "id": cat_id,
+                "name": name,
+                "parent_id": parent_id,
+                "children": json.loads(children),
+                "leaf": bool(leaf),
+                "depth": depth
+            }
+        row = conn.execute("SELECT value FROM meta WHERE key = 'built_at'").fetchone()
+    finally:
+        conn.close()
+    return CategoryTree(categories, built_at=row[0] if row else None)
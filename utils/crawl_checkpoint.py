@@ -0,0 +1,23 @@
+import json
+import os
+
+def load_checkpoint(path):
+    """Return the checkpoint stored at path, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_checkpoint(path, checkpoint):
+    """Atomically replace the checkpoint at path so a crash never leaves it half-written"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def clear_checkpoint(path):
+    """Remove the checkpoint once the crawl it describes has completed"""
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,279 @@
+import json
+
+DAY = 24 * 3600
+
+def level_request_xml(cat_id):
+    """Build the XML body /icbu/product/schema/level/get expects alongside cat_id"""
+    return f'''<?xml version="1.0" encoding="UTF-8"?>
+<request>
+    <cat_id>{cat_id}</cat_id>
+</request>'''
+
+def inventory_item(product_id, sku_id, quantity, relative=False):
+    """Build one inventoryItems entry for inventory.update; relative adjusts instead of setting"""
+    inventory = {"amountDiff": str(quantity)} if relative else {"amount": str(quantity)}
+    return {"productId": str(product_id), "skuId": str(sku_id), "inventory": inventory}
+
+class Field:
+    """
+    One argument of an endpoint and how it is sent.
+
+    Args:
+        arg (str): Keyword argument the caller passes
+        name (str, optional): Wire name (the JSON key when the endpoint wraps
+            its arguments in an object); defaults to arg
+        encode (callable, optional): Converts the value before sending. Top-level
+            parameters default to str; values inside a wrapper object are kept as given
+        required (bool, optional): Raise ValueError when the argument is missing
+        default (optional): Value used when the caller passes None
+    """
+
+    def __init__(self, arg, name=None, encode=None, required=False, default=None):
+        self.arg = arg
+        self.name = name or arg
+        self.encode = encode
+        self.required = required
+        self.default = default
+
+class Endpoint:
+    """
+    Declarative description of one GOP API operation.
+
+    The spec says how arguments become request parameters (including
+    endpoints that take a single JSON-encoded request object), where the
+    useful part of the response lives, whether the call is safe to repeat,
+    how long its responses may be cached and how fast it may be called. The
+    client, retry policy, response cache and rate limiter all read these
+    specs, so they behave the same for every endpoint.
+
+    Args:
+        name (str): Registry name, e.g. "product.get"
+        path (str): API operation path signed into every request
+        fields (list, optional): Field specs for the accepted arguments
+        wrapper (str, optional): Parameter holding all fields as one JSON object
+        result_path (tuple, optional): Keys leading to the result in the response body
+        idempotent (bool, optional): Read-only call that can safely be retried
+        ttl (int, optional): Seconds a successful response may be cached
+        rate (float, optional): Tighter per-endpoint rate limit in requests per second
+        url_path (bool, optional): Post to server_url + path rather than the bare entry point
+        authenticated (bool, optional): False for token endpoints signed without access_token
+        extra_fields (bool, optional): Pass unknown arguments through under their own names
+        multipart (bool, optional): Sent with an uploaded file
+    """
+
+    def __init__(self, name, path, fields=(), wrapper=None, result_path=('result',), idempotent=False, ttl=None,
+                 rate=None, url_path=False, authenticated=True, extra_fields=False, multipart=False):
+        self.name = name
+        self.path = path
+        self.fields = list(fields)
+        self.wrapper = wrapper
+        self.result_path = tuple(result_path)
+        self.idempotent = idempotent
+        self.ttl = ttl
+        self.rate = rate
+        self.url_path = url_path
+        self.authenticated = authenticated
+        self.extra_fields = extra_fields
+        self.multipart = multipart
+
+    def __repr__(self):
+        return f"Endpoint({self.name!r}, {self.path!r})"
+
+    @property
+    def post_path(self):
+        """Suffix to append to the server URL when posting"""
+        return self.path if self.url_path else ''
+
+    def build(self, **kwargs):
+        """
+        Turn keyword arguments into the endpoint's business parameters (unsigned).
+
+        Raises:
+            TypeError: For arguments the endpoint does not accept
+            ValueError: When a required argument is missing
+        """
+        known = {field.arg for field in self.fields}
+        unknown = [arg for arg in kwargs if arg not in known]
+        if unknown and not self.extra_fields:
+            raise TypeError(f"{self.name} got unexpected arguments: {', '.join(sorted(unknown))}")
+
+        values = {}
+        fields = self.fields + [Field(arg) for arg in unknown]
+        for field in fields:
+            value = kwargs.get(field.arg)
+            if value is None:
+                value = field.default
+            if value is None:
+                if field.required:
+                    raise ValueError(f"{self.name} requires {field.arg}")
+                continue
+            if field.encode is not None:
+                value = field.encode(value)
+            elif not self.wrapper:
+                value = str(value)
+            values[field.name] = value
+
+        if self.wrapper:
+            return {self.wrapper: json.dumps(values)}
+        return values
+
+    def parse(self, response_data):
+        """Return the result found at result_path in a decoded response, or None"""
+        result = response_data
+        for key in self.result_path:
+            if not isinstance(result, dict) or key not in result:
+                return None
+            result = result[key]
+        return result
+
+def _photobank_filters():
+    return [
+        Field('gmt_create_start', 'gmtCreateStart'),
+        Field('gmt_create_end', 'gmtCreateEnd'),
+        Field('gmt_modified_start', 'gmtModifiedStart'),
+        Field('gmt_modified_end', 'gmtModifiedEnd')
+    ]
+
+ENDPOINTS = {endpoint.name: endpoint for endpoint in [
+    # Authorization
+    Endpoint('auth.token.create', '/auth/token/create', [Field('code', required=True)],
+             result_path=(), url_path=True, authenticated=False),
+    Endpoint('auth.token.refresh', '/auth/token/refresh', [Field('refresh_token', required=True)],
+             result_path=(), url_path=True, authenticated=False),
+
+    # Products
+    Endpoint('product.get', '/icbu/product/get', [
+        Field('product_id', 'productId', encode=int, required=True),
+        Field('website', 'webSite')
+    ], wrapper='product_get_request', result_path=('product',), idempotent=True),
+    Endpoint('product.list', '/alibaba/icbu/product/list', [
+        Field('filter_type', default='onSelling'),
+        Field('current_page', default=1),
+        Field('page_size', default=20),
+        Field('subject'),
+        Field('gmt_modified_from'),
+        Field('gmt_modified_to'),
+        Field('group_id1'),
+        Field('group_id2'),
+        Field('group_id3'),
+        Field('id'),
+        Field('category_id'),
+        Field('schema_custom_fields')
+    ], url_path=True, idempotent=True, rate=2.0, extra_fields=True),
+    Endpoint('product.available.get', '/icbu/product/other/available/get',
+             [Field('product_id', required=True)], idempotent=True),
+    Endpoint('product.score.get', '/icbu/product/score/get',
+             [Field('product_id', required=True)], idempotent=True),
+    Endpoint('product.id.encrypt', '/alibaba/icbu/product/id/encrypt', [
+        Field('convert_type', required=True),
+        Field('product_id', required=True)
+    ], idempotent=True),
+    Endpoint('product.group.add', '/icbu/product/group/add', [
+        Field('product_ids', 'productIds', encode=lambda ids: [str(product_id) for product_id in ids], required=True),
+        Field('group_id', 'groupId', encode=str, required=True)
+    ], wrapper='request'),
+    Endpoint('product.display.update', '/icbu/product/update/display', [
+        Field('product_id', 'productId', encode=str, required=True),
+        Field('display', encode=bool, required=True)
+    ], wrapper='request'),
+
+    # Inventory
+    Endpoint('inventory.get', '/icbu/product/inventory/get', [
+        Field('product_id', 'productId', encode=str, required=True)
+    ], wrapper='inventory_get_request', idempotent=True),
+    Endpoint('inventory.update', '/icbu/product/inventory/update', [
+        Field('items', 'inventoryItems', required=True)
+    ], wrapper='inventory_update_request'),
+
+    # Categories
+    Endpoint('category.get', '/icbu/product/category/get', [Field('cat_id', required=True)],
+             result_path=('result', 'result'), url_path=True, idempotent=True, ttl=7 * DAY),
+    Endpoint('category.id.mapping', '/alibaba/icbu/category/id/mapping', [
+        Field('convert_type'),
+        Field('cat_id'),
+        Field('attribute_id'),
+        Field('attribute_value_id')
+    ], url_path=True, idempotent=True, ttl=7 * DAY),
+
+    # Schemas
+    Endpoint('schema.get', '/alibaba/icbu/product/schema/get', [
+        Field('cat_id', required=True),
+        Field('schema_id')
+    ], idempotent=True, ttl=DAY),
+    Endpoint('schema.render', '/icbu/product/schema/render', [
+        Field('schema_id', required=True),
+        Field('language')
+    ], idempotent=True, ttl=3600),
+    Endpoint('schema.render.draft', '/icbu/product/schema/render/draft', [
+        Field('draft_id', required=True),
+        Field('language')
+    ], idempotent=True),
+    Endpoint('schema.add', '/icbu/product/schema/add', [
+        Field('cat_id', required=True),
+        Field('schema_data', encode=json.dumps, required=True)
+    ]),
+    Endpoint('schema.add.draft', '/icbu/product/schema/add/draft', [
+        Field('cat_id', required=True),
+        Field('schema_data', encode=json.dumps, required=True)
+    ]),
+    Endpoint('schema.update', '/icbu/product/schema/update', [
+        Field('schema_id', required=True),
+        Field('schema_data', encode=json.dumps, required=True)
+    ]),
+    Endpoint('schema.level.get', '/icbu/product/schema/level/get', [
+        Field('language', default='en_US'),
+        Field('cat_id', required=True),
+        Field('cat_id', 'xml', encode=level_request_xml)
+    ], idempotent=True, ttl=DAY),
+
+    # Photo bank
+    Endpoint('photobank.group.list', '/icbu/product/photobank/group/list', [
+        Field('current_page', 'currentPage', default=1),
+        Field('page_size', 'pageSize', default=20)
+    ] + _photobank_filters(), wrapper='request', idempotent=True),
+    Endpoint('photobank.group.operate', '/icbu/product/photobank/group/operate', [
+        Field('operation', required=True),
+        Field('group_id', 'groupId'),
+        Field('group_name', 'groupName'),
+        Field('description')
+    ], wrapper='request'),
+    Endpoint('photobank.list', '/icbu/product/photobank/list', [
+        Field('current_page', 'currentPage', default=1),
+        Field('page_size', 'pageSize', default=20),
+        Field('group_id', 'groupId')
+    ] + _photobank_filters(), wrapper='request', idempotent=True),
+    Endpoint('photobank.upload', '/alibaba/icbu/photobank/upload', [
+        Field('group_id', 'groupId', required=True),
+        Field('image_name', 'imageName', required=True)
+    ], wrapper='request', result_path=('image',), multipart=True),
+]}
+
+_by_path = {}
+for _endpoint in ENDPOINTS.values():
+    _by_path.setdefault(_endpoint.path, _endpoint)
+
+def get_endpoint(name):
+    """
+    Look up an endpoint by registry name ("product.get") or API path ("/icbu/product/get").
+
+    Raises:
+        KeyError: If no such endpoint is registered
+    """
+    if isinstance(name, Endpoint):
+        return name
+    endpoint = ENDPOINTS.get(name) or _by_path.get(name)
+    if endpoint is None:
+        raise KeyError(f"Unknown endpoint: {name}")
+    return endpoint
+
+def idempotent_paths():
+    """Return the paths of every read-only endpoint"""
+    return {endpoint.path for endpoint in ENDPOINTS.values() if endpoint.idempotent}
+
+def default_ttls():
+    """Return {path: ttl} for every endpoint whose responses may be cached"""
+    return {endpoint.path: endpoint.ttl for endpoint in ENDPOINTS.values() if endpoint.ttl}
+
+def default_rates():
+    """Return {path: requests per second} for every endpoint with its own rate limit"""
+    return {endpoint.path: endpoint.rate for endpoint in ENDPOINTS.values() if endpoint.rate}
@@ -0,0 +1,29 @@
+import os
+
+_loaded = False
+_env_path = None
+
+def load_env():
+    """
+    Load variables from the .env file into os.environ, once per process.
+
+    Scripts call this from main() instead of at import time, so importing an
+    endpoint module never touches the filesystem and python-dotenv is only
+    imported when a script actually runs. Variables already set in the
+    environment take precedence, as with load_dotenv(). The .env in (or above)
+    the working directory is preferred, since that is where the token scripts
+    write; otherwise the one next to the scripts is used. The file chosen is
+    remembered so token writes go back to it (see env_path()).
+    """
+    global _loaded, _env_path
+    if _loaded:
+        return
+    from dotenv import find_dotenv, load_dotenv
+    path = find_dotenv(usecwd=True) or find_dotenv()
+    _env_path = os.path.abspath(path) if path else None
+    load_dotenv(_env_path)
+    _loaded = True
+
+def env_path():
+    """Return the .env file load_env() read, or .env in the working directory if none was found"""
+    return _env_path or os.path.abspath('.env')
@@ -0,0 +1,436 @@
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+
+from utils.endpoints import get_endpoint
+from utils.rate_limiter import get_rate_limiter
+from utils.retry import get_retry_policy
+from utils.response_cache import get_response_cache
+from utils.token_manager import get_token_manager
+
+ALIBABA_SERVER_CALL_ENTRY = "https://openapi-api.alibaba.com/rest"
+
+# Headers required by the GOP protocol on every form-encoded call
+GOP_HEADERS = {
+    'X-Protocol': 'GOP',
+    'Content-Type': 'application/x-www-form-urlencoded'
+}
+
+# (connect, read) timeout in seconds; without one a stalled connection never raises Timeout
+DEFAULT_TIMEOUT = (10.0, 60.0)
+
+# Connection pool sizing; one pool per host, enough slots for threaded batch jobs
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# GOP error codes and message fragments that mean "slow down"
+THROTTLE_CODES = {'ApiCallLimit', 'AppCallLimit', 'UserCallLimit', 'IspOverFlow', 'Throttling', 'TooManyRequests', '7'}
+THROTTLE_MESSAGES = ('too many requests', 'call limit', 'frequency', 'throttl', 'exceeded the limit')
+
+# GOP error codes and message fragments that mean the access token is no longer valid
+AUTH_EXPIRED_CODES = {'IllegalAccessToken', 'InvalidAccessToken', 'AccessTokenExpired', 'ExpiredAccessToken', '27'}
+AUTH_EXPIRED_MESSAGES = ('token expired', 'token is expired', 'invalid access token', 'illegal access token',
+                         'invalid session', 'session expired')
+
+# Values of "code"/"error_code" keys, found without decoding the whole body
+_ERROR_CODE_PATTERN = re.compile(r'"(?:error_)?code"\s*:\s*"?([^",}\s]*)')
+
+# Default for GopClient(cache=...), so that an explicit None can disable caching
+_DEFAULT_CACHE = object()
+
+# Default for the data argument of the response checks: the body has not been decoded yet
+_UNDECODED = object()
+
+_session = None
+_session_lock = threading.Lock()
+_clients = {}
+_clients_lock = threading.Lock()
+
+def generate_signature(params, secret_key, api_operation):
+    """Generate the HMAC-SHA256 signature for a GOP request"""
+    sorted_params = sorted(params.items())
+    concatenated_string = api_operation
+    for k, v in sorted_params:
+        concatenated_string += f"{k}{v}"
+    hashed = hmac.new(secret_key.encode('utf-8'), concatenated_string.encode('utf-8'), hashlib.sha256).hexdigest().upper()
+    return hashed
+
+def format_signature(params, api_operation):
+    """Show how the signature was computed, for checking against the API docs"""
+    formatted_output = f"hex(sha256('{api_operation}'"
+    for k, v in sorted(params.items()):
+        if k != 'sign':
+            formatted_output += f"{k}{v}"
+    formatted_output += f"))={params['sign']}"
+    return formatted_output
+
+def current_timestamp():
+    """Return the current time in milliseconds, as expected by the API"""
+    return str(int(time.time() * 1000))
+
+def decode_body(response):
+    """Return the decoded JSON body of response, or None if it is not JSON"""
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+def _is_gop_error(response, codes, messages, data=_UNDECODED):
+    """Return True if the response body is a GOP error with one of the given codes or message fragments"""
+    if data is _UNDECODED:
+        text = response.text
+        lowered = text.lower()
+        # Cheap pre-check so large successful payloads are not decoded just to
+        # be looked at. Short numeric codes such as '7' would match almost any
+        # body as plain text, so those are looked for as the value of a code
+        # field instead.
+        if not any(code.lower() in lowered for code in codes if len(code) > 1) \
+                and not any(message in lowered for message in messages) \
+                and not any(value in codes for value in _ERROR_CODE_PATTERN.findall(text)):
+            return False
+        data = decode_body(response)
+    if not isinstance(data, dict):
+        return False
+    # Gateway errors come wrapped as {"error_response": {"code": ..., "msg": ...}}
+    if isinstance(data.get('error_response'), dict):
+        data = data['error_response']
+    found_codes = {str(data.get(key)) for key in ('error_code', 'code', 'sub_code') if data.get(key) is not None}
+    message = ' '.join(str(data.get(key) or '') for key in ('error_message', 'message', 'msg', 'sub_msg')).lower()
+    return bool(found_codes & codes) or any(fragment in message for fragment in messages)
+
+def rewind_files(files):
+    """Seek every file object in a requests files mapping back to the start so it can be sent again"""
+    for value in (files or {}).values():
+        file_obj = value[1] if isinstance(value, (tuple, list)) else value
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+
+def is_throttled(response, data=_UNDECODED):
+    """Return True if the response is an HTTP 429 or a GOP throttle error; data is the body if already decoded"""
+    if response.status_code == 429:
+        return True
+    return _is_gop_error(response, THROTTLE_CODES, THROTTLE_MESSAGES, data)
+
+def is_error_body(data):
+    """
+    Return True if a decoded response body is a GOP or endpoint failure.
+
+    Covers {"error_response": ...} gateway errors, error_* / errorCode /
+    errorMessage keys, top-level {"type": ..., "code": ..., "message": ...}
+    errors (any code other than "0"), and {"success": false} either at the
+    top level or inside "result".
+    """
+    if not isinstance(data, dict):
+        return False
+    if any(key in data for key in ('error_response', 'error_code', 'error_message', 'errorCode', 'errorMessage')):
+        return True
+    if 'code' in data and str(data['code']) != '0':
+        return True
+    if 'type' in data and 'message' in data:
+        return True
+    result = data.get('result')
+    for container in (data, result if isinstance(result, dict) else {}):
+        if container.get('success') in (False, 'false'):
+            return True
+    return False
+
+def is_success(response, data=_UNDECODED):
+    """Return True for a 2xx response whose body is not a GOP error; data is the body if already decoded"""
+    if not 200 <= response.status_code < 300:
+        return False
+    if data is _UNDECODED:
+        data = decode_body(response)
+    # Non-JSON bodies (e.g. file downloads) decode to None and carry no GOP error to look for
+    return not is_error_body(data)
+
+def is_auth_expired(response, data=_UNDECODED):
+    """Return True if the response is an HTTP 401 or a GOP expired/invalid token error; data is the body if already decoded"""
+    if response.status_code == 401:
+        return True
+    return _is_gop_error(response, AUTH_EXPIRED_CODES, AUTH_EXPIRED_MESSAGES, data)
+
+def parse_timeout(value):
+    """Parse "read" or "connect,read" seconds into a timeout for requests; "0" disables it"""
+    if not value:
+        return DEFAULT_TIMEOUT
+    parts = [float(part) for part in value.split(',')]
+    if parts == [0]:
+        return None
+    return parts[0] if len(parts) == 1 else (parts[0], parts[1])
+
+def get_timeout():
+    """
+    Return the request timeout configured in the environment.
+
+    Environment:
+        GOP_TIMEOUT: Seconds, either "read" for both phases or "connect,read" (default 10,60; 0 disables)
+    """
+    return parse_timeout(os.getenv('GOP_TIMEOUT'))
+
+def create_session(pool_maxsize=POOL_MAXSIZE):
+    """Create a session whose adapters keep up to pool_maxsize connections per host"""
+    # requests is only imported once a session is needed, keeping module import cheap
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+class GopClient:
+    """
+    Signs and sends GOP requests over the shared keep-alive session, within the shared rate limit.
+
+    Transient failures are retried according to the retry policy; `stats`
+    counts requests, retries and calls that still failed after retrying, and
+    last_retries() gives the count for the calling thread's latest request.
+    Requests time out after GOP_TIMEOUT (10 s to connect, 60 s to read by
+    default), so a stalled connection is retried instead of hanging.
+    Read-only endpoints with a TTL are answered from the response cache when
+    possible; pass use_cache=False to post() to go to the network (and
+    refresh the cache), or set `cache` to None to disable it entirely.
+    When the access token comes from the environment, a shared TokenManager
+    refreshes it ahead of EXPIRES_AT and after auth-expired responses.
+    invoke()/request() take an endpoint name from utils.endpoints and build,
+    sign and route the call from its spec.
+    """
+
+    def __init__(self, app_key, app_secret, access_token=None, server_url=ALIBABA_SERVER_CALL_ENTRY, timeout=None, session=None,
+                 rate_limiter=None, retry_policy=None, cache=_DEFAULT_CACHE, token_manager=None):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.access_token = access_token
+        self.server_url = server_url
+        self.timeout = timeout if timeout is not None else get_timeout()
+        self.session = session or get_session()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.cache = get_response_cache() if cache is _DEFAULT_CACHE else cache
+        self.token_manager = token_manager or get_token_manager(app_key, app_secret, access_token)
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+    def sign(self, params, api_operation):
+        """Add the signature to an already complete params dict and return it"""
+        params['sign'] = generate_signature(params, self.app_secret, api_operation)
+        return params
+
+    def build_params(self, api_operation, extra=None):
+        """
+        Build the standard signed parameter set for an authenticated call.
+
+        Args:
+            api_operation (str): API path, e.g. "/icbu/product/get"
+            extra (dict, optional): Business parameters to include before signing
+
+        Returns:
+            dict: Parameters including timestamp and sign
+        """
+        params = {
+            "app_key": self.app_key,
+            "format": "json",
+            "method": api_operation,
+            "access_token": self.current_token(),
+            "sign_method": "sha256",
+            "timestamp": current_timestamp()
+        }
+        if extra:
+            params.update(extra)
+        return self.sign(params, api_operation)
+
+    def current_token(self):
+        """Return the access token to sign with, refreshed first if it is about to expire"""
+        if self.token_manager is not None:
+            self.access_token = self.token_manager.token()
+        return self.access_token
+
+    def _resign(self, params, endpoint, access_token=None):
+        """Give params a fresh timestamp (and optionally a new token) and sign them again"""
+        params['timestamp'] = current_timestamp()
+        if access_token is not None:
+            params['access_token'] = access_token
+        del params['sign']
+        self.sign(params, endpoint)
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _send(self, endpoint, params, path, files, headers):
+        """
+        Send one attempt within the rate limit.
+
+        The body is decoded once here and the result is shared by every check
+        made on the response.
+
+        Returns:
+            tuple: (response, decoded body or None, whether it was throttled)
+        """
+        self.rate_limiter.acquire(endpoint)
+        response = self.session.post(f"{self.server_url}{path}", data=params, files=files, headers=headers, timeout=self.timeout)
+        data = decode_body(response)
+        throttled = is_throttled(response, data)
+        if throttled:
+            self.rate_limiter.record_throttle(endpoint)
+        elif is_success(response, data):
+            # 5xx and error bodies are not evidence the server can take more, so they leave the rate alone
+            self.rate_limiter.record_success(endpoint)
+        return response, data, throttled
+
+    def post(self, params, path='', files=None, headers=None, use_cache=True):
+        """
+        POST signed parameters to the server entry once the rate limiter allows it.
+
+        Throttle responses slow the limiter down for this endpoint and other
+        responses let it speed back up. Transient failures are retried with
+        backoff (re-signed with a fresh timestamp); multipart uploads are sent
+        once. The number of retries is stored on the response (or on the
+        exception) as `retries`; cached responses have `from_cache` set.
+        A request rejected for an expired token is re-sent once with a
+        refreshed token when a token manager is attached.
+
+        Args:
+            params (dict): Signed request parameters
+            path (str, optional): Suffix appended to the server URL (some endpoints expect the API path)
+            files (dict, optional): Multipart files; the form Content-Type header is dropped in that case
+            headers (dict, optional): Overrides for the default GOP headers
+            use_cache (bool, optional): Set to False to skip cache lookups; the fresh response still refreshes the cache
+
+        Returns:
+            requests.Response
+        """
+        import requests
+        if headers is None:
+            headers = {'X-Protocol': 'GOP'} if files else GOP_HEADERS
+        endpoint = params.get('method') or path
+        cache = self.cache if not files else None
+        scope = self.cache_scope(params) if cache is not None else ''
+        if cache is not None and use_cache:
+            cached = cache.get(endpoint, params, scope)
+            if cached is not None:
+                cached.retries = self._local.retries = 0
+                return cached
+        max_attempts = 1 if files else self.retry_policy.max_attempts
+        attempt = 1
+        auth_retried = False
+        while True:
+            try:
+                response, data, throttled = self._send(endpoint, params, path, files, headers)
+                if not auth_retried and self._refresh_after(response, data, params):
+                    auth_retried = True
+                    self._resign(params, endpoint, self.access_token)
+                    # The first send read multipart files to the end
+                    rewind_files(files)
+                    response, data, throttled = self._send(endpoint, params, path, files, headers)
+            except requests.exceptions.RequestException as e:
+                if attempt >= max_attempts or not self.retry_policy.should_retry_exception(endpoint, e):
+                    e.retries = self._local.retries = attempt - 1
+                    self._count(requests=1, retries=attempt - 1, failures=1)
+                    raise
+            else:
+                if attempt >= max_attempts or not self.retry_policy.should_retry_response(endpoint, response, throttled):
+                    response.retries = self._local.retries = attempt - 1
+                    failed = throttled or response.status_code >= 500
+                    self._count(requests=1, retries=attempt - 1, failures=int(failed))
+                    if cache is not None:
+                        cache.put(endpoint, params, response, scope, data)
+                    return response
+            time.sleep(self.retry_policy.delay(attempt))
+            attempt += 1
+            if 'sign' in params and 'timestamp' in params:
+                self._resign(params, endpoint, self.current_token() if 'access_token' in params else None)
+
+    def cache_scope(self, params):
+        """
+        Identify whose data a response is, so cached responses are never shared between sellers.
+
+        The seller account is used when the token manager knows it, since it
+        survives token refreshes; otherwise a hash of the access token.
+        """
+        account = getattr(self.token_manager, 'account', None)
+        if account:
+            return f"account:{account}"
+        token = params.get('access_token')
+        if not token:
+            return ''
+        return "token:" + hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def last_retries(self):
+        """Return how many times this thread's most recent post() was retried"""
+        return getattr(self._local, 'retries', 0)
+
+    def _refresh_after(self, response, data, params):
+        """Refresh the token if the response says it expired; return True if a resend is worthwhile"""
+        if self.token_manager is None or 'sign' not in params or not params.get('access_token'):
+            return False
+        if not is_auth_expired(response, data):
+            return False
+        failed_token = params['access_token']
+        self.access_token = self.token_manager.refresh(failed_token)
+        return self.access_token != failed_token
+
+    def call(self, api_operation, extra=None, path=''):
+        """Sign, send and decode a request in one step, returning the JSON body"""
+        params = self.build_params(api_operation, extra)
+        response = self.post(params, path=path)
+        return response.json()
+
+    def prepare(self, endpoint, **kwargs):
+        """
+        Build and sign the parameters for a registered endpoint.
+
+        Token endpoints (authenticated=False) are signed without access_token.
+
+        Args:
+            endpoint (str or Endpoint): Registry name or API path, e.g. "product.get"
+            **kwargs: Arguments declared by the endpoint's fields
+
+        Returns:
+            dict: Signed request parameters
+        """
+        spec = get_endpoint(endpoint)
+        extra = spec.build(**kwargs)
+        if spec.authenticated:
+            return self.build_params(spec.path, extra)
+        params = {
+            "app_key": self.app_key,
+            "sign_method": "sha256",
+            "timestamp": current_timestamp()
+        }
+        params.update(extra)
+        return self.sign(params, spec.path)
+
+    def request(self, endpoint, files=None, use_cache=True, **kwargs):
+        """Sign and send a call to a registered endpoint (posted to the path it expects), returning the response"""
+        spec = get_endpoint(endpoint)
+        params = self.prepare(spec, **kwargs)
+        return self.post(params, path=spec.post_path, files=files, use_cache=use_cache)
+
+    def invoke(self, endpoint, **kwargs):
+        """Call a registered endpoint and return the decoded JSON body"""
+        return self.request(endpoint, **kwargs).json()
+
+def get_client(app_key, app_secret, access_token=None):
+    """Return a cached GopClient for the given credentials"""
+    key = (app_key, app_secret, access_token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = GopClient(app_key, app_secret, access_token)
+            _clients[key] = client
+        return client
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DEFAULT_ID_MAP_PATH = os.path.join('api_logs', 'product_id_map.sqlite3')
+
+# convert_type values accepted by /alibaba/icbu/product/id/encrypt
+ENCRYPT = "1"
+DECRYPT = "2"
+
+class ProductIdMap:
+    """
+    Permanent bidirectional map between original and encrypted product IDs.
+
+    The conversion is deterministic, so once an ID has been converted in
+    either direction both lookups are answered locally from then on.
+    """
+
+    def __init__(self, path=DEFAULT_ID_MAP_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS product_ids (
+                original_id TEXT PRIMARY KEY,
+                encrypted_id TEXT NOT NULL UNIQUE,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def lookup(self, product_id, convert_type):
+        """Return the converted ID for product_id, or None if it has never been converted"""
+        if str(convert_type) == ENCRYPT:
+            query = 'SELECT encrypted_id FROM product_ids WHERE original_id = ?'
+        else:
+            query = 'SELECT original_id FROM product_ids WHERE encrypted_id = ?'
+        with self._lock:
+            row = self._conn.execute(query, (str(product_id),)).fetchone()
+        return row[0] if row else None
+
+    def lookup_many(self, product_ids, convert_type):
+        """Return {product_id: converted_id} for the IDs already in the map"""
+        return {product_id: converted for product_id in product_ids
+                if (converted := self.lookup(product_id, convert_type)) is not None}
+
+    def add(self, product_id, converted_id, convert_type):
+        """Record one conversion result"""
+        self.add_many({product_id: converted_id}, convert_type)
+
+    def add_many(self, conversions, convert_type):
+        """Record {product_id: converted_id} results from one direction in a single transaction"""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if str(convert_type) == ENCRYPT:
+            rows = [(str(original), str(encrypted), now) for original, encrypted in conversions.items()]
+        else:
+            rows = [(str(original), str(encrypted), now) for encrypted, original in conversions.items()]
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO product_ids VALUES (?, ?, ?)', rows)
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM product_ids').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,114 @@
+import json
+import os
+from datetime import datetime
+
+HEADER_RECORD = "header"
+FOOTER_RECORD = "footer"
+
+class ProductStreamWriter:
+    """
+    Append-only JSON Lines writer for product crawls.
+
+    The first line is a header record, each following line is one product, and
+    a footer record with the final count is written on close. Metadata lines
+    carry a "record" key so readers can tell them apart from products.
+    Each batch is flushed as soon as it is written, so memory stays flat and
+    a partial file is still readable if the crawl dies.
+
+    The header records the API query in query_parameters and any other
+    information about the file (such as a sync watermark) in metadata.
+
+    Products are deduplicated by dedup_key (only the ids are kept in memory).
+    Passing resume_offset reopens an existing file, discards anything written
+    after that byte offset and continues appending from there.
+    """
+
+    def __init__(self, path, query_parameters=None, resume_offset=None, dedup_key='id', metadata=None):
+        self.path = path
+        self.count = 0
+        self.skipped = 0
+        self.dedup_key = dedup_key
+        self._seen = set()
+        if resume_offset is None:
+            self._file = open(path, 'w', encoding='utf-8')
+            self._write({
+                "record": HEADER_RECORD,
+                "fetch_start": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "query_parameters": query_parameters or {},
+                "metadata": metadata or {}
+            })
+        else:
+            os.truncate(path, resume_offset)
+            for product in read_products(path):
+                self._remember(product)
+                self.count += 1
+            self._file = open(path, 'a', encoding='utf-8')
+        self._file.flush()
+
+    @property
+    def offset(self):
+        """Byte offset just past the last flushed product"""
+        return self._file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._file.closed:
+            self.close(completed=exc_type is None)
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+
+    def _remember(self, product):
+        """Record the product's id; return False if it was already written"""
+        product_id = product.get(self.dedup_key) if self.dedup_key else None
+        if product_id is None:
+            return True
+        if product_id in self._seen:
+            return False
+        self._seen.add(product_id)
+        return True
+
+    def write_products(self, products):
+        """Append a batch of products, skipping ones already written, and flush them to disk"""
+        for product in products:
+            if not self._remember(product):
+                self.skipped += 1
+                continue
+            self._write(product)
+            self.count += 1
+        self._file.flush()
+
+    def close(self, **metadata):
+        """Write the footer record (with any extra metadata) and close the file"""
+        footer = {
+            "record": FOOTER_RECORD,
+            "total_products": self.count,
+            "fetch_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        footer.update(metadata)
+        self._write(footer)
+        self._file.close()
+
+def read_products(path):
+    """Yield products from a JSON Lines product file, skipping metadata records"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('record') in (HEADER_RECORD, FOOTER_RECORD):
+                continue
+            yield record
+
+def read_header(path):
+    """Return the header record of a JSON Lines product file, or None if it has none"""
+    with open(path, 'r', encoding='utf-8') as f:
+        line = f.readline().strip()
+    if not line:
+        return None
+    record = json.loads(line)
+    return record if record.get('record') == HEADER_RECORD else None
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+from utils.endpoints import default_rates
+
+# Requests per second allowed across all endpoints combined
+DEFAULT_GLOBAL_RATE = 5.0
+
+# Tighter per-endpoint limits in requests per second, as declared in the endpoint registry
+DEFAULT_ENDPOINT_RATES = default_rates()
+
+# AIMD tuning: halve the rate on a throttle, then win it back step by step
+MULTIPLICATIVE_DECREASE = 0.5
+ADDITIVE_INCREASE = 0.05
+MIN_RATE = 0.1
+# Throttles reported within this many seconds of a decrease count as the same event
+DECREASE_COOLDOWN = 1.0
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate` tokens per second.
+
+    Callers reserve a token up front and sleep for however long the bucket
+    says, so concurrent callers are spaced evenly instead of racing for the
+    next refill. A rate of None or 0 means unlimited.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.max_rate = rate
+        self.capacity = capacity or max(1.0, rate or 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._decreased = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait before using it"""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available and return the time spent waiting"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def decrease(self):
+        """Cut the rate multiplicatively and drop any saved-up burst"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._decreased < DECREASE_COOLDOWN:
+                return
+            self._decreased = now
+            self.rate = max(MIN_RATE, self.rate * MULTIPLICATIVE_DECREASE)
+            self._tokens = min(self._tokens, 0.0)
+
+    def increase(self):
+        """Raise the rate additively, never above the configured limit"""
+        if not self.rate or self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + ADDITIVE_INCREASE)
+
+class RateLimiter:
+    """
+    Global token bucket plus optional per-endpoint buckets.
+
+    A call waits for its endpoint's bucket first and then for the global one,
+    so no endpoint can exceed its own limit and all endpoints together stay
+    under the global limit.
+
+    When adaptive, throttle responses reported through record_throttle halve
+    the governing bucket's rate and each success reported through
+    record_success adds a little back (AIMD), up to the configured limit.
+    """
+
+    def __init__(self, global_rate=DEFAULT_GLOBAL_RATE, endpoint_rates=None, burst=None, adaptive=True):
+        self.burst = burst
+        self.adaptive = adaptive
+        self.global_bucket = TokenBucket(global_rate, burst)
+        self.endpoint_buckets = {}
+        self._lock = threading.Lock()
+        for endpoint, rate in (endpoint_rates or {}).items():
+            self.set_rate(endpoint, rate)
+
+    def set_rate(self, endpoint, rate):
+        """Set (or with None, remove) the limit for one endpoint"""
+        with self._lock:
+            if rate is None:
+                self.endpoint_buckets.pop(endpoint, None)
+            else:
+                self.endpoint_buckets[endpoint] = TokenBucket(rate, self.burst)
+
+    def acquire(self, endpoint=None):
+        """Block until endpoint may be called; returns the total seconds waited"""
+        waited = 0.0
+        bucket = self.endpoint_buckets.get(endpoint)
+        if bucket is not None:
+            waited += bucket.acquire()
+        waited += self.global_bucket.acquire()
+        return waited
+
+    def _governing_bucket(self, endpoint):
+        return self.endpoint_buckets.get(endpoint) or self.global_bucket
+
+    def record_throttle(self, endpoint=None):
+        """Back off after the API reported that endpoint is being throttled"""
+        if self.adaptive:
+            self._governing_bucket(endpoint).decrease()
+
+    def record_success(self, endpoint=None):
+        """Ramp back up after a call to endpoint went through"""
+        if self.adaptive:
+            self._governing_bucket(endpoint).increase()
+
+    def current_rate(self, endpoint=None):
+        """Return the rate currently applied to endpoint"""
+        return self._governing_bucket(endpoint).rate
+
+def parse_endpoint_rates(value):
+    """Parse "/api/one=2,/api/two=0.5" into {"/api/one": 2.0, "/api/two": 0.5}"""
+    rates = {}
+    for item in (value or "").split(','):
+        if not item.strip():
+            continue
+        endpoint, _, rate = item.partition('=')
+        rates[endpoint.strip()] = float(rate)
+    return rates
+
+def load_rate_limiter():
+    """
+    Build a RateLimiter from the environment, falling back to the defaults.
+
+    Environment variables:
+        GOP_RATE_LIMIT: Global requests per second (0 disables the global limit)
+        GOP_RATE_BURST: Requests allowed back to back before limiting kicks in
+        GOP_ENDPOINT_RATE_LIMITS: Per-endpoint limits, e.g. "/icbu/product/get=3,/alibaba/icbu/product/list=1"
+        GOP_RATE_ADAPTIVE: Set to 0 to keep limits fixed instead of backing off on throttle responses
+    """
+    global_rate = float(os.getenv('GOP_RATE_LIMIT', DEFAULT_GLOBAL_RATE))
+    burst = os.getenv('GOP_RATE_BURST')
+    endpoint_rates = dict(DEFAULT_ENDPOINT_RATES)
+    endpoint_rates.update(parse_endpoint_rates(os.getenv('GOP_ENDPOINT_RATE_LIMITS')))
+    adaptive = os.getenv('GOP_RATE_ADAPTIVE', '1') not in ('0', 'false', 'False')
+    return RateLimiter(global_rate, endpoint_rates, burst=float(burst) if burst else None, adaptive=adaptive)
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter shared by every GOP client"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = load_rate_limiter()
+        return _limiter
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.endpoints import default_ttls
+from utils.terminal_colors import print_info
+
+DEFAULT_CACHE_PATH = os.path.join('api_logs', 'response_cache.sqlite3')
+
+# Seconds a successful response stays fresh, as declared in the endpoint registry;
+# endpoints without a TTL are never cached
+DEFAULT_TTLS = default_ttls()
+
+# Parameters that change on every call (or every token refresh) without changing the answer
+VOLATILE_PARAMS = {'timestamp', 'sign', 'access_token'}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def cache_key(endpoint, params, scope=''):
+    """Hash the endpoint, the caller's scope (seller) and its parameters, ignoring the volatile ones"""
+    canonical = sorted((k, str(v)) for k, v in params.items() if k not in VOLATILE_PARAMS)
+    raw = json.dumps([endpoint, scope, canonical], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def is_cacheable(response, data=None):
+    """
+    Only HTTP 200 JSON responses that pass gop_client.is_success are stored.
+
+    Pass the decoded body as data when the caller already has it, so the
+    response is not parsed again.
+    """
+    # Imported here because gop_client imports this module
+    from utils.gop_client import decode_body, is_success
+    if response.status_code != 200:
+        return False
+    if data is None:
+        data = decode_body(response)
+    return isinstance(data, dict) and is_success(response, data)
+
+class ResponseCache:
+    """
+    SQLite-backed cache of GOP responses for read-only endpoints.
+
+    Entries are keyed on the endpoint, the seller scope supplied by the client
+    and the canonical parameters, and expire after the endpoint's TTL. Hits, misses and stores are counted in `stats`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.stats = {"hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        """Open the database on first use so uncached scripts never touch it"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self._conn.commit()
+        return self._conn
+
+    def ttl(self, endpoint):
+        """Return the TTL for endpoint, or None if it is not cached"""
+        return self.ttls.get(endpoint)
+
+    def get(self, endpoint, params, scope=''):
+        """Return a cached requests.Response for the call, or None on a miss"""
+        if not self.ttl(endpoint):
+            return None
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT status_code, headers, body FROM responses WHERE key = ? AND expires_at > ?',
+                (cache_key(endpoint, params, scope), time.time())
+            ).fetchone()
+            self.stats["hits" if row else "misses"] += 1
+        if row is None:
+            return None
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        response = requests.Response()
+        response.status_code = row[0]
+        response.headers = CaseInsensitiveDict(json.loads(row[1]))
+        response._content = bytes(row[2])
+        response.encoding = 'utf-8'
+        response.from_cache = True
+        return response
+
+    def put(self, endpoint, params, response, scope='', data=None):
+        """Store response if the endpoint is cached and the call succeeded; data is its body if already decoded"""
+        ttl = self.ttl(endpoint)
+        if not ttl or not is_cacheable(response, data):
+            return
+        headers = {k: v for k, v in response.headers.items() if k.lower() != 'set-cookie'}
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                (cache_key(endpoint, params, scope), endpoint, response.status_code,
+                 json.dumps(headers), response.content, time.time() + ttl)
+            )
+            conn.commit()
+            self.stats["stores"] += 1
+
+    def purge_expired(self):
+        """Delete expired entries and return how many were removed"""
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+            conn.commit()
+            return cursor.rowcount
+
+    def summary(self):
+        """One-line description of the hit/miss/store counters, for script output"""
+        return f"Response cache: {self.stats['hits']} hits, {self.stats['misses']} misses, {self.stats['stores']} stored"
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+def parse_ttls(value):
+    """Parse "/api/one=3600,/api/two=0" into {"/api/one": 3600, "/api/two": 0}"""
+    ttls = {}
+    for item in (value or "").split(','):
+        if not item.strip():
+            continue
+        endpoint, _, ttl = item.partition('=')
+        ttls[endpoint.strip()] = int(ttl)
+    return ttls
+
+def get_response_cache():
+    """
+    Return the process-wide response cache, or None if caching is disabled.
+
+    Environment variables:
+        GOP_CACHE: Set to 0 to disable the cache
+        GOP_CACHE_PATH: SQLite file to use (default: api_logs/response_cache.sqlite3)
+        GOP_CACHE_TTLS: Per-endpoint TTL overrides in seconds, e.g. "/icbu/product/category/get=86400" (0 disables one endpoint)
+    """
+    global _cache
+    if os.getenv('GOP_CACHE', '1') in ('0', 'false', 'False'):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            ttls = dict(DEFAULT_TTLS)
+            ttls.update(parse_ttls(os.getenv('GOP_CACHE_TTLS')))
+            _cache = ResponseCache(os.getenv('GOP_CACHE_PATH', DEFAULT_CACHE_PATH), ttls)
+        return _cache
+
+def print_cache_summary():
+    """Print the hit/miss/store counters of the process-wide cache, if caching is enabled"""
+    cache = get_response_cache()
+    if cache is not None:
+        print_info(cache.summary())
@@ -0,0 +1,76 @@
+import os
+import random
+
+from utils.endpoints import idempotent_paths
+
+# Read-only operations that are safe to send more than once, as declared in the endpoint registry
+IDEMPOTENT_OPERATIONS = idempotent_paths()
+
+# HTTP statuses worth retrying; 429 and throttle errors are handled separately
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+
+_policy = None
+
+def is_idempotent(api_operation):
+    """Return True if api_operation only reads data and can safely be repeated"""
+    return api_operation in IDEMPOTENT_OPERATIONS
+
+class RetryPolicy:
+    """
+    Decides whether a failed GOP call is retried and how long to wait first.
+
+    Reads are retried on connection errors, timeouts, 5xx responses and
+    throttling. Writes are only retried when the request provably did not
+    take effect: the connection could not be opened, or the API rejected
+    the call as throttled. Delays use exponential backoff with full jitter.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """Return a jittered delay before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    def should_retry_exception(self, api_operation, exc):
+        """Return True if the request raising exc should be sent again"""
+        import requests
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True
+        if not is_idempotent(api_operation):
+            return False
+        return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+    def should_retry_response(self, api_operation, response, throttled):
+        """Return True if the request that produced response should be sent again"""
+        if throttled:
+            return True
+        return is_idempotent(api_operation) and response.status_code in RETRYABLE_STATUS_CODES
+
+def load_retry_policy():
+    """
+    Build a RetryPolicy from the environment, falling back to the defaults.
+
+    Environment variables:
+        GOP_MAX_ATTEMPTS: Total attempts per call, including the first (1 disables retries)
+        GOP_RETRY_BASE_DELAY: Backoff before the first retry, in seconds
+        GOP_RETRY_MAX_DELAY: Upper bound on any single backoff, in seconds
+    """
+    return RetryPolicy(
+        max_attempts=int(os.getenv('GOP_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+        base_delay=float(os.getenv('GOP_RETRY_BASE_DELAY', DEFAULT_BASE_DELAY)),
+        max_delay=float(os.getenv('GOP_RETRY_MAX_DELAY', DEFAULT_MAX_DELAY))
+    )
+
+def get_retry_policy():
+    """Return the process-wide retry policy"""
+    global _policy
+    if _policy is None:
+        _policy = load_retry_policy()
+    return _policy
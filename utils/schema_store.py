@@ -0,0 +1,112 @@
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_SCHEMA_DIR = os.path.join('api_logs', 'schemas')
+
+class SchemaStore:
+    """
+    Content-addressed store for category schema XML.
+
+    Each distinct document is written once to objects/<sha256>.xml, and a
+    SQLite index records which hash is current for every (cat_id, schema_id)
+    plus a version row each time that hash changes. Refetching an unchanged
+    schema only updates its checked_at time, so callers can skip downstream
+    work whenever put() reports no change.
+    """
+
+    def __init__(self, root=DEFAULT_SCHEMA_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, 'index.sqlite3'))
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS versions (
+                cat_id TEXT NOT NULL,
+                schema_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                fetched_at TEXT NOT NULL,
+                PRIMARY KEY (cat_id, schema_id, version)
+            );
+            CREATE TABLE IF NOT EXISTS current (
+                cat_id TEXT NOT NULL,
+                schema_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                checked_at TEXT NOT NULL,
+                PRIMARY KEY (cat_id, schema_id)
+            );
+        ''')
+        self._conn.commit()
+
+    def object_path(self, content_hash):
+        """Return the file holding the XML with this hash"""
+        return os.path.join(self.objects_dir, f"{content_hash}.xml")
+
+    def put(self, cat_id, xml, schema_id=None):
+        """
+        Store the schema XML fetched for a category.
+
+        Returns:
+            dict: hash, version, changed (False if identical to the current
+                version) and previous_hash
+        """
+        key = (str(cat_id), str(schema_id or ''))
+        data = xml.encode('utf-8')
+        content_hash = hashlib.sha256(data).hexdigest()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        path = self.object_path(content_hash)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        row = self._conn.execute('SELECT version, hash FROM current WHERE cat_id = ? AND schema_id = ?', key).fetchone()
+        previous_version, previous_hash = row if row else (0, None)
+        changed = previous_hash != content_hash
+        version = previous_version + 1 if changed else previous_version
+        with self._conn:
+            if changed:
+                self._conn.execute('INSERT INTO versions VALUES (?, ?, ?, ?, ?)', key + (version, content_hash, now))
+            self._conn.execute('INSERT OR REPLACE INTO current VALUES (?, ?, ?, ?, ?)', key + (version, content_hash, now))
+        return {"hash": content_hash, "version": version, "changed": changed, "previous_hash": previous_hash}
+
+    def current(self, cat_id, schema_id=None):
+        """Return (version, hash, checked_at) for the current schema, or None"""
+        return self._conn.execute(
+            'SELECT version, hash, checked_at FROM current WHERE cat_id = ? AND schema_id = ?',
+            (str(cat_id), str(schema_id or ''))
+        ).fetchone()
+
+    def latest(self, cat_id):
+        """Return (version, hash, checked_at) for the category's most recently stored schema under any schema_id, or None"""
+        return self._conn.execute(
+            'SELECT version, hash, checked_at FROM current WHERE cat_id = ? ORDER BY checked_at DESC LIMIT 1',
+            (str(cat_id),)
+        ).fetchone()
+
+    def get(self, cat_id, schema_id=None):
+        """Return the current schema XML for a category, or None if it was never fetched"""
+        current = self.current(cat_id, schema_id)
+        if current is None:
+            return None
+        with open(self.object_path(current[1]), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def versions(self, cat_id, schema_id=None):
+        """Return [(version, hash, fetched_at), ...] for a category, oldest first"""
+        return self._conn.execute(
+            'SELECT version, hash, fetched_at FROM versions WHERE cat_id = ? AND schema_id = ? ORDER BY version',
+            (str(cat_id), str(schema_id or ''))
+        ).fetchall()
+
+    def categories(self):
+        """Return [(cat_id, schema_id, hash), ...] for every current schema"""
+        return self._conn.execute('SELECT cat_id, schema_id, hash FROM current ORDER BY cat_id, schema_id').fetchall()
+
+    def close(self):
+        self._conn.close()
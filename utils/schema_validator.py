@@ -0,0 +1,243 @@
+import io
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from utils.schema_store import SchemaStore
+from utils.terminal_colors import print_success, print_error, print_warning
+
+# Field types whose value is a list
+MULTI_VALUE_TYPES = {'multiCheck', 'multiInput', 'multiComplex'}
+# Field types that carry no submitted value
+DISPLAY_TYPES = {'label'}
+
+# Compiled validators kept per process, most recently used last
+MAX_CACHED_VALIDATORS = 32
+_validators = OrderedDict()
+
+class FieldSpec:
+    """Constraints compiled from one <field> of a category schema"""
+
+    def __init__(self, field_id, name, field_type, rules, options, children):
+        self.id = field_id
+        self.name = name or field_id
+        self.type = field_type
+        self.rules = rules
+        self.options = options
+        self.children = children
+
+    @property
+    def required(self):
+        return self.rules.get('requiredRule', {}).get('value') == 'true'
+
+def compile_field(element):
+    """Turn a <field> element into a FieldSpec, including nested complex fields"""
+    rules = {}
+    for rule in element.findall('./rules/rule'):
+        rules[rule.get('name')] = dict(rule.attrib)
+    options = {option.get('value') for option in element.findall('./options/option')}
+    children = [compile_field(child) for child in element.findall('./fields/field')]
+    return FieldSpec(element.get('id'), element.get('name'), element.get('type'), rules, options, children)
+
+def iter_fields(source):
+    """
+    Stream the top-level fields of a schema document as FieldSpecs.
+
+    Uses iterparse and clears each top-level <field> once it has been
+    compiled, so memory stays proportional to the largest single field
+    rather than the whole document.
+
+    Args:
+        source: Path or binary file object holding the schema XML
+
+    Yields:
+        FieldSpec: One per top-level field, in document order
+    """
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            if element.tag == 'field':
+                yield compile_field(element)
+            # Drop the finished subtree (and any earlier siblings) from the root
+            root.clear()
+
+def _is_empty(value):
+    return value is None or value == '' or value == [] or value == {}
+
+def _check_number(spec, value, errors, path):
+    rules = spec.rules
+    value_type = rules.get('valueTypeRule', {}).get('value')
+    if value_type in ('integer', 'long'):
+        try:
+            int(str(value))
+        except ValueError:
+            errors.append(f"{path}: '{value}' is not an integer")
+            return
+    elif value_type in ('decimal', 'double', 'float'):
+        try:
+            float(str(value))
+        except ValueError:
+            errors.append(f"{path}: '{value}' is not a number")
+            return
+    for rule_name, compare, word in (('minValueRule', lambda v, b: v < b, 'at least'),
+                                     ('maxValueRule', lambda v, b: v > b, 'at most')):
+        rule = rules.get(rule_name)
+        if not rule:
+            continue
+        try:
+            number, bound = float(str(value)), float(rule['value'])
+        except (KeyError, ValueError):
+            continue
+        exclusive = rule.get('exProperty') == 'not include'
+        if compare(number, bound) or (exclusive and number == bound):
+            errors.append(f"{path}: {value} must be {word} {rule['value']}{' (exclusive)' if exclusive else ''}")
+
+def _check_scalar(spec, value, errors, path):
+    if spec.options and spec.type in ('singleCheck', 'multiCheck') and str(value) not in spec.options:
+        errors.append(f"{path}: '{value}' is not an allowed value")
+    text = str(value)
+    max_length = spec.rules.get('maxLengthRule', {}).get('value')
+    if max_length and max_length.isdigit() and len(text) > int(max_length):
+        errors.append(f"{path}: length {len(text)} exceeds {max_length}")
+    min_length = spec.rules.get('minLengthRule', {}).get('value')
+    if min_length and min_length.isdigit() and len(text) < int(min_length):
+        errors.append(f"{path}: length {len(text)} is below {min_length}")
+    _check_number(spec, value, errors, path)
+
+def validate_field(spec, value, errors, path=None):
+    """Append every violation of spec by value to errors"""
+    path = path or spec.name
+    if spec.type in DISPLAY_TYPES:
+        return
+    if _is_empty(value):
+        if spec.required:
+            errors.append(f"{path}: required field is missing")
+        return
+
+    if spec.type in MULTI_VALUE_TYPES:
+        values = value if isinstance(value, list) else [value]
+        for rule_name in ('maxInputNumRule', 'maxTargetSizeRule'):
+            limit = spec.rules.get(rule_name, {}).get('value')
+            if limit and limit.isdigit() and len(values) > int(limit):
+                errors.append(f"{path}: {len(values)} values exceed the limit of {limit}")
+    else:
+        values = [value]
+
+    for index, item in enumerate(values):
+        item_path = f"{path}[{index}]" if spec.type in MULTI_VALUE_TYPES else path
+        if spec.children:
+            if not isinstance(item, dict):
+                errors.append(f"{item_path}: expected an object")
+                continue
+            for child in spec.children:
+                validate_field(child, item.get(child.id), errors, f"{item_path}.{child.name}")
+        else:
+            _check_scalar(spec, item, errors, item_path)
+
+class SchemaValidator:
+    """
+    Checks schema_data payloads locally against a category's schema XML.
+
+    Covers required fields, allowed option values, value types, length and
+    numeric ranges, and value counts, recursing into complex fields.
+    Payloads map field ids to values (lists for multi-value fields, objects
+    for complex fields).
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.by_id = {spec.id: spec for spec in self.fields}
+
+    @classmethod
+    def from_file(cls, source):
+        """Build a validator by streaming a schema XML file (see iter_fields)"""
+        return cls(iter_fields(source))
+
+    @classmethod
+    def from_xml(cls, xml):
+        return cls.from_file(io.BytesIO(xml.encode('utf-8')))
+
+    def validate(self, schema_data):
+        """Return a list of human-readable problems (empty if the payload looks valid)"""
+        if not isinstance(schema_data, dict):
+            return ["schema_data must be a JSON object of field ids to values"]
+        errors = []
+        for spec in self.fields:
+            validate_field(spec, schema_data.get(spec.id), errors)
+        return errors
+
+    def validate_many(self, payloads):
+        """Validate payloads in bulk and return {index: errors} for the invalid ones"""
+        results = {}
+        for index, schema_data in enumerate(payloads):
+            errors = self.validate(schema_data)
+            if errors:
+                results[index] = errors
+        return results
+
+def load_validator(cat_id, store=None, schema_id=None):
+    """
+    Build a validator from the category's schema in the local schema store.
+
+    The schema stored for (cat_id, schema_id) is used when there is one;
+    otherwise the category's most recently stored schema is, so a schema
+    fetched with product_schema_get.py --schema_id is found either way.
+
+    Validators are memoized by schema hash, so an unchanged schema is only
+    compiled once per process; only the most recently used
+    MAX_CACHED_VALIDATORS are kept so sweeps over many categories stay flat.
+
+    Returns:
+        SchemaValidator, or None if the schema has not been fetched yet
+    """
+    own_store = store is None
+    store = store or SchemaStore()
+    try:
+        current = store.current(cat_id, schema_id) or store.latest(cat_id)
+        if current is None:
+            return None
+        content_hash = current[1]
+        validator = _validators.get(content_hash)
+        if validator is None:
+            validator = SchemaValidator.from_file(store.object_path(content_hash))
+            _validators[content_hash] = validator
+            if len(_validators) > MAX_CACHED_VALIDATORS:
+                _validators.popitem(last=False)
+        else:
+            _validators.move_to_end(content_hash)
+        return validator
+    finally:
+        if own_store:
+            store.close()
+
+def check_schema_data(cat_id, schema_data, store=None, schema_id=None):
+    """Return the validation errors for schema_data, or None if the category's schema is not stored locally"""
+    validator = load_validator(cat_id, store, schema_id)
+    return None if validator is None else validator.validate(schema_data)
+
+def validate_before_send(cat_id, schema_data, schema_id=None):
+    """
+    Check schema_data against the locally stored schema and report the outcome.
+
+    A category without a stored schema is let through with a warning.
+
+    Returns:
+        bool: False if the data failed validation and should not be sent
+    """
+    errors = check_schema_data(cat_id, schema_data, schema_id=schema_id)
+    if errors is None:
+        print_warning(f"No local schema for category {cat_id}; run product_schema_get.py to enable validation")
+        return True
+    if errors:
+        print_error(f"\nSchema data failed local validation ({len(errors)} problems):")
+        for error in errors:
+            print_error(f"  - {error}")
+        return False
+    print_success("Schema data passed local validation")
+    return True
@@ -0,0 +1,180 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+from utils.token_store import TokenStore
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Refresh this many seconds before EXPIRES_AT so in-flight work never sees an expired token
+DEFAULT_REFRESH_MARGIN = 300
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+def parse_expiry(value):
+    """Parse an EXPIRES_AT value written by the token scripts, or return None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIME_FORMAT)
+    except ValueError:
+        return None
+
+def token_fields(response_data):
+    """
+    Extract the token details from a /auth/token/create or /auth/token/refresh response.
+
+    Returns:
+        dict: ACCESS_TOKEN, REFRESH_TOKEN, ACCOUNT, EXPIRES_AT and
+            REFRESH_EXPIRES_AT as .env values, or None if any are missing
+    """
+    access_token = response_data.get('access_token')
+    refresh_token = response_data.get('refresh_token')
+    account = response_data.get('account')
+    expires_in = response_data.get('expires_in')
+    refresh_expires_in = response_data.get('refresh_expires_in')
+    if not (access_token and refresh_token and account and expires_in and refresh_expires_in):
+        return None
+    now = datetime.now()
+    return {
+        'ACCESS_TOKEN': access_token,
+        'REFRESH_TOKEN': refresh_token,
+        'ACCOUNT': account,
+        'EXPIRES_AT': (now + timedelta(seconds=int(expires_in))).strftime(TIME_FORMAT),
+        'REFRESH_EXPIRES_AT': (now + timedelta(seconds=int(refresh_expires_in))).strftime(TIME_FORMAT)
+    }
+
+class TokenManager:
+    """
+    Keeps the access token valid for the lifetime of a process.
+
+    Clients ask for token() on every request. Shortly before expires_at the
+    token is refreshed via /auth/token/refresh; the refresh runs once under a
+    lock and every other worker picks up the new token. refresh() can also be
+    called after an auth-expired response: passing the token that failed
+    means only the first caller refreshes and the rest reuse its result.
+
+    Refreshes are also single-flight across processes: the manager takes the
+    token store's file lock and re-reads it first, adopting a token another
+    process has just written instead of spending (and invalidating) the
+    shared refresh token again.
+    """
+
+    def __init__(self, app_key, app_secret, access_token, refresh_token=None, expires_at=None,
+                 refresh_margin=DEFAULT_REFRESH_MARGIN, store=None, account=None):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = expires_at
+        self.refresh_margin = refresh_margin
+        self.account = account
+        self.store = store if store is not None else TokenStore()
+        self.refreshes = 0
+        self.issued = {access_token}
+        self._lock = threading.Lock()
+
+    def expiring(self, expires_at):
+        return expires_at is not None and datetime.now() >= expires_at - timedelta(seconds=self.refresh_margin)
+
+    def needs_refresh(self):
+        return bool(self.refresh_token) and self.expiring(self.expires_at)
+
+    def token(self):
+        """Return a usable access token, refreshing it first if it is about to expire"""
+        if self.needs_refresh():
+            with self._lock:
+                if self.needs_refresh():
+                    self._refresh(self.access_token)
+        return self.access_token
+
+    def refresh(self, failed_token=None):
+        """
+        Force a refresh, e.g. after the server rejected the token.
+
+        Args:
+            failed_token (str, optional): The token the failed request used; if
+                another worker has already replaced it, no new refresh is made
+
+        Returns:
+            str: The current access token (unchanged if the refresh failed)
+        """
+        with self._lock:
+            if failed_token is None or failed_token == self.access_token:
+                self._refresh(self.access_token)
+            return self.access_token
+
+    def _adopt(self, fields):
+        self.access_token = fields['ACCESS_TOKEN']
+        self.refresh_token = fields.get('REFRESH_TOKEN') or self.refresh_token
+        self.expires_at = parse_expiry(fields.get('EXPIRES_AT'))
+        self.account = fields.get('ACCOUNT') or self.account
+        self.issued.add(self.access_token)
+
+    def _refresh(self, stale_token):
+        """Replace stale_token, from the store if another process already did, else via the API; must hold the lock"""
+        with self.store.lock():
+            stored = self.store.read()
+            token = stored.get('ACCESS_TOKEN')
+            if token and token != stale_token and not self.expiring(parse_expiry(stored.get('EXPIRES_AT'))):
+                self._adopt(stored)
+                return True
+
+            fields = self._request_refresh(stored.get('REFRESH_TOKEN') or self.refresh_token)
+            if fields is None:
+                return False
+            # Refresh tokens rotate, so the new one must be persisted before the lock is released
+            self.store.write(fields)
+            self._adopt(fields)
+            self.refreshes += 1
+            return True
+
+    def _request_refresh(self, refresh_token):
+        """Call /auth/token/refresh and return the new token fields, or None on failure"""
+        if not refresh_token:
+            return None
+        import requests
+        from utils.gop_client import GopClient
+
+        client = GopClient(self.app_key, self.app_secret)
+        try:
+            response = client.request('auth.token.refresh', refresh_token=refresh_token, use_cache=False)
+            fields = token_fields(response.json()) if response.status_code == 200 else None
+        except (requests.exceptions.RequestException, ValueError):
+            fields = None
+        # None keeps the old token; the caller's request will fail normally and can be retried later
+        return fields
+
+def get_token_manager(app_key, app_secret, access_token):
+    """
+    Return the process-wide token manager for the credentials in the environment.
+
+    A manager is only used when access_token is the ACCESS_TOKEN from the
+    environment and a REFRESH_TOKEN is available; otherwise the caller
+    supplied its own token and None is returned. Every client using the same
+    app key shares one manager, so a refresh is seen by all workers.
+
+    Environment variables:
+        ACCESS_TOKEN, REFRESH_TOKEN, EXPIRES_AT, ACCOUNT: Written by 2createtoken.py / 3refreshtoken.py
+        GOP_TOKEN_REFRESH: Set to 0 to disable automatic refresh
+        GOP_TOKEN_REFRESH_MARGIN: Seconds before EXPIRES_AT to refresh (default: 300)
+    """
+    if os.getenv('GOP_TOKEN_REFRESH', '1') in ('0', 'false', 'False'):
+        return None
+    with _managers_lock:
+        manager = _managers.get(app_key)
+        if manager is not None:
+            # Tokens the manager has already replaced still belong to it
+            return manager if access_token in manager.issued else None
+        if not access_token or access_token != os.getenv('ACCESS_TOKEN') or not os.getenv('REFRESH_TOKEN'):
+            return None
+        manager = TokenManager(
+            app_key, app_secret, access_token,
+            refresh_token=os.getenv('REFRESH_TOKEN'),
+            expires_at=parse_expiry(os.getenv('EXPIRES_AT')),
+            refresh_margin=int(os.getenv('GOP_TOKEN_REFRESH_MARGIN', DEFAULT_REFRESH_MARGIN)),
+            account=os.getenv('ACCOUNT')
+        )
+        _managers[app_key] = manager
+        return manager
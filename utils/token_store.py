@@ -0,0 +1,98 @@
+import os
+import stat
+import time
+from contextlib import contextmanager
+
+from utils.env import env_path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class TokenStore:
+    """
+    Process-safe reads and writes of the token values kept in .env.
+
+    Every write happens under an advisory lock on a sidecar lock file and is
+    applied by writing a temporary copy and renaming it over .env, so readers
+    never see a half-written file and concurrent writers never interleave.
+    Lines for other keys (and comments) are preserved.
+
+    Hold lock() around read-check-refresh-write sequences so only one
+    process on the host refreshes a token; the others re-read the file once
+    they get the lock and adopt the token it wrote.
+
+    By default the store uses the .env file that load_env() read the
+    credentials from, wherever the process was started.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or env_path()
+        self.lock_path = f"{self.path}.lock"
+
+    @contextmanager
+    def lock(self):
+        """Hold the store's exclusive lock, blocking until other processes release it"""
+        with open(self.lock_path, 'a+') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+            try:
+                yield self
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def read(self):
+        """Return the current values in the file as a dict (empty if it does not exist)"""
+        if not os.path.exists(self.path):
+            return {}
+        from dotenv import dotenv_values
+        return {key: value for key, value in dotenv_values(self.path).items() if value is not None}
+
+    def write(self, values):
+        """Set values in the file atomically; the caller must hold lock()"""
+        lines = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+
+        remaining = dict(values)
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#') or '=' not in stripped:
+                continue
+            key = stripped.split('=', 1)[0].strip()
+            if key.startswith('export '):
+                key = key[len('export '):].strip()
+            if key in remaining:
+                lines[index] = f"{key}='{remaining.pop(key)}'"
+        lines.extend(f"{key}='{value}'" for key, value in remaining.items())
+
+        # The file holds secrets: the replacement starts owner-only and then
+        # takes the original file's mode, so a rewrite never loosens it
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(self.path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+        os.replace(tmp_path, self.path)
+
+    def update(self, values):
+        """Set values in the file under the lock"""
+        with self.lock():
+            self.write(values)